@@ -11,6 +11,8 @@
 #
 # Requirements:
 #   pip install reportlab
+#   (optional, faster keyword scan) pip install pyahocorasick
+#   (optional, faster JSON load) pip install orjson
 #
 # Outputs:
 #   output/<stem>_meeting_report.pdf
@@ -27,6 +29,7 @@ from collections import Counter, defaultdict
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
+from xml.sax.saxutils import escape
 
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.units import inch
@@ -39,16 +42,27 @@ from reportlab.platypus import (
     Table,
     TableStyle,
     PageBreak,
-    KeepTogether,
 )
 from reportlab.lib.enums import TA_LEFT
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 
 # ----------------------------
 # Helpers
 # ----------------------------
 
-STOPWORDS = set("""
+STOPWORDS = frozenset("""
 a an and are as at be by for from has have he her hers him his i if in into is it its
 just like me my no not of on or our ours she so than that the their them then there
 they this to up was we were what when where which who why will with you your yours
@@ -66,9 +80,93 @@ RISK_PATTERNS = [
     r"\b(risk|issue|problem|blocked|blocker|concern|worry|delay|late|fail|failing|bug|break)\b",
 ]
 
-QUESTION_PATTERNS = [
-    r"\?\s*$",
-]
+# Compiled once at import; reused by every call below.
+_ACTION_RE = re.compile("|".join(ACTION_PATTERNS), re.IGNORECASE)
+_DECISION_RE = re.compile("|".join(DECISION_PATTERNS), re.IGNORECASE)
+_RISK_RE = re.compile("|".join(RISK_PATTERNS), re.IGNORECASE)
+_WS_RE = re.compile(r"\s+")
+_QUOTE_TBL = str.maketrans({"\u2019": "'", "\u201c": '"', "\u201d": '"'})
+_TOK_RE = re.compile(r"[a-z0-9']{3,}")
+
+# One scan per line classifies into every bucket (named group -> bucket key).
+_COMBINED_RE = re.compile(
+    "(?P<actions>" + "|".join(ACTION_PATTERNS) + ")"
+    "|(?P<decisions>" + "|".join(DECISION_PATTERNS) + ")"
+    "|(?P<risks>" + "|".join(RISK_PATTERNS) + ")",
+    re.IGNORECASE,
+)
+_CATEGORY_RES = {
+    "actions": _ACTION_RE,
+    "decisions": _DECISION_RE,
+    "risks": _RISK_RE,
+}
+
+
+def _literal_phrases(patterns: List[str]) -> List[str]:
+    """
+    Expand r"\b(a|b[' ]?c)\b" style patterns into plain lowercase phrases.
+    The only regex syntax used inside the groups is the optional [' ]? joiner.
+    """
+    phrases = []
+    for p in patterns:
+        body = p[3:-3] if p.startswith(r"\b(") and p.endswith(r")\b") else p
+        for alt in body.split("|"):
+            variants = [""]
+            for part in re.split(r"(\[' \]\?)", alt):
+                if part == "[' ]?":
+                    variants = [v + c for v in variants for c in ("", "'", " ")]
+                else:
+                    variants = [v + part for v in variants]
+            phrases.extend(v.lower() for v in variants)
+    return phrases
+
+
+def _build_keyword_automaton():
+    """Single Aho-Corasick automaton over every action/decision/risk phrase."""
+    auto = ahocorasick.Automaton()
+    buckets: Dict[str, set] = defaultdict(set)
+    for key, patterns in (("actions", ACTION_PATTERNS), ("decisions", DECISION_PATTERNS), ("risks", RISK_PATTERNS)):
+        for phrase in _literal_phrases(patterns):
+            buckets[phrase].add(key)
+    for phrase, keys in buckets.items():
+        auto.add_word(phrase, (len(phrase), frozenset(keys)))
+    auto.make_automaton()
+    return auto
+
+
+_KEYWORD_AC = _build_keyword_automaton() if AHOCORASICK_AVAILABLE else None
+
+
+def _is_word_char(c: str) -> bool:
+    return c.isalnum() or c == "_"
+
+
+def _classify(txt: str) -> set:
+    """Return the subset of {actions, decisions, risks} whose phrases occur in txt."""
+    if _KEYWORD_AC is None:
+        hits = {m.lastgroup for m in _COMBINED_RE.finditer(txt)}
+        if hits:
+            # finditer never overlaps, so a phrase that starts where another
+            # category already matched can be hidden; only hit lines pay for
+            # the per-category fallback.
+            hits.update(key for key, rx in _CATEGORY_RES.items() if key not in hits and rx.search(txt))
+        return hits
+
+    low = txt.lower()
+    n = len(low)
+    hits = set()
+    # Automaton reports every (overlapping) phrase; keep the \b...\b semantics.
+    for end, (length, keys) in _KEYWORD_AC.iter(low):
+        start = end - length + 1
+        if start > 0 and _is_word_char(low[start - 1]):
+            continue
+        if end + 1 < n and _is_word_char(low[end + 1]):
+            continue
+        hits |= keys
+        if len(hits) == 3:
+            break
+    return hits
+
 
 TIME_FMT = "%M:%S"
 
@@ -84,49 +182,12 @@ def sec_to_mmss(seconds: float) -> str:
 
 
 def normalize_text(t: str) -> str:
-    t = t.replace("\u2019", "'").replace("\u201c", '"').replace("\u201d", '"')
-    t = re.sub(r"\s+", " ", t).strip()
-    return t
+    return _WS_RE.sub(" ", t.translate(_QUOTE_TBL)).strip()
 
 
 def tokenize(t: str) -> List[str]:
-    t = t.lower()
-    t = re.sub(r"[^a-z0-9\s']", " ", t)
-    tokens = [w for w in t.split() if w and w not in STOPWORDS and len(w) > 2]
-    return tokens
-
-
-def find_matches(lines: List[Tuple[str, str]]) -> Dict[str, List[Tuple[str, str]]]:
-    """
-    lines: list of (speaker, text)
-    Returns dict with keys: actions, decisions, risks, questions
-    """
-    actions = []
-    decisions = []
-    risks = []
-    questions = []
-
-    action_re = re.compile("|".join(ACTION_PATTERNS), re.IGNORECASE)
-    decision_re = re.compile("|".join(DECISION_PATTERNS), re.IGNORECASE)
-    risk_re = re.compile("|".join(RISK_PATTERNS), re.IGNORECASE)
-    question_re = re.compile("|".join(QUESTION_PATTERNS), re.IGNORECASE)
-
-    for spk, txt in lines:
-        if action_re.search(txt):
-            actions.append((spk, txt))
-        if decision_re.search(txt):
-            decisions.append((spk, txt))
-        if risk_re.search(txt):
-            risks.append((spk, txt))
-        if question_re.search(txt.strip()):
-            questions.append((spk, txt))
-
-    return {
-        "actions": actions,
-        "decisions": decisions,
-        "risks": risks,
-        "questions": questions,
-    }
+    # Runs of [a-z0-9'] shorter than 3 chars are dropped by the pattern itself.
+    return [w for w in _TOK_RE.findall(t.lower()) if w not in STOPWORDS]
 
 
 def parse_named_script_txt(path: Path) -> List[Tuple[str, str]]:
@@ -137,24 +198,32 @@ def parse_named_script_txt(path: Path) -> List[Tuple[str, str]]:
       theo: ...
     Returns list of (speaker, text)
     """
-    raw = path.read_text(encoding="utf-8", errors="replace")
-    blocks = [b.strip() for b in raw.split("\n\n") if b.strip()]
     out = []
-    for b in blocks:
+
+    def flush(lines: List[str]):
         # allow "speaker: text" on first line, then maybe wrapped lines
-        lines = [ln.strip() for ln in b.splitlines() if ln.strip()]
-        if not lines:
-            continue
         first = lines[0]
-        m = re.match(r"^([^:]{1,40}):\s*(.*)$", first)
-        if m:
-            spk = m.group(1).strip()
-            rest_first = m.group(2).strip()
-            rest = " ".join([rest_first] + lines[1:]).strip()
+        name, sep, rest_first = first.partition(":")
+        if sep and 1 <= len(name) <= 40:
+            spk = name.strip()
+            rest = " ".join([rest_first.strip()] + lines[1:]).strip()
         else:
             spk = "Unknown"
             rest = " ".join(lines).strip()
         out.append((spk, normalize_text(rest)))
+
+    # Stream line by line; only the current block is held in memory.
+    current: List[str] = []
+    with path.open("r", encoding="utf-8", errors="replace") as f:
+        for ln in f:
+            ln = ln.strip()
+            if ln:
+                current.append(ln)
+            elif current:
+                flush(current)
+                current = []
+    if current:
+        flush(current)
     return out
 
 
@@ -163,9 +232,24 @@ def load_utterances_json(path: Path) -> List[dict]:
     Expects list of dicts with keys:
       start (seconds), end (seconds), speaker (A/B/...), text
     """
-    data = json.loads(path.read_text(encoding="utf-8"))
+    if ORJSON_AVAILABLE:
+        # orjson decodes UTF-8 itself; skip the str round-trip
+        data = orjson.loads(path.read_bytes())
+    else:
+        data = json.loads(path.read_text(encoding="utf-8"))
     if not isinstance(data, list):
         return []
+    try:
+        # Fast path: well-formed output from transcribe.py
+        return [
+            {"start": float(u["start"]), "end": float(u["end"]), "speaker": str(u["speaker"]), "text": text}
+            for u in data
+            if (text := normalize_text(str(u["text"])))
+        ]
+    except (KeyError, TypeError, ValueError):
+        # A malformed record; fall through to the tolerant per-record path
+        pass
+    # Slow path: tolerate missing keys / bad records one by one
     cleaned = []
     for u in data:
         try:
@@ -187,47 +271,70 @@ class MeetingStats:
     speaker_turn_counts: Dict[str, int]
     top_keywords: List[Tuple[str, int]]
     total_words: int
+    duration_mmss: str                      # "N/A" when duration is unknown
+    speakers_sorted: List[Tuple[str, int]]  # (speaker, words), most words first
 
 
-def compute_stats(named_lines: List[Tuple[str, str]], utterances: List[dict]) -> MeetingStats:
-    # duration
-    duration_s = 0.0
-    for u in utterances:
-        duration_s = max(duration_s, float(u["end"]))
+def analyze(
+    named_lines: List[Tuple[str, str]],
+    utterances: List[dict],
+) -> Tuple[MeetingStats, Dict[str, List[Tuple[str, str]]]]:
+    """
+    Single pass over named_lines: each (speaker, text) is tokenized and
+    classified exactly once.
+    Returns (stats, matches) where matches has keys
+    actions, decisions, risks, questions.
+    """
+    # duration ("end" is already a float from load_utterances_json)
+    duration_s = max((u["end"] for u in utterances), default=0.0)
 
-    speaker_word_counts = Counter()
-    speaker_turn_counts = Counter()
-    all_tokens = []
+    # plain dicts: cheaper than Counter for per-line integer accumulation
+    speaker_word_counts: Dict[str, int] = {}
+    speaker_turn_counts: Dict[str, int] = {}
+    keyword_counter = Counter()
+    matches = {"actions": [], "decisions": [], "risks": [], "questions": []}
 
     for spk, txt in named_lines:
         tokens = tokenize(txt)
-        speaker_word_counts[spk] += len(tokens)
-        speaker_turn_counts[spk] += 1
-        all_tokens.extend(tokens)
-
-    total_words = sum(speaker_word_counts.values())
-    top_keywords = Counter(all_tokens).most_common(12)
-
-    return MeetingStats(
+        speaker_word_counts[spk] = speaker_word_counts.get(spk, 0) + len(tokens)
+        speaker_turn_counts[spk] = speaker_turn_counts.get(spk, 0) + 1
+        keyword_counter.update(tokens)
+
+        hits = _classify(txt)
+        if hits:
+            item = (spk, txt)
+            if "actions" in hits:
+                matches["actions"].append(item)
+            if "decisions" in hits:
+                matches["decisions"].append(item)
+            if "risks" in hits:
+                matches["risks"].append(item)
+        # text is already normalize_text()-stripped
+        if txt.endswith("?"):
+            matches["questions"].append((spk, txt))
+
+    stats = MeetingStats(
         duration_s=duration_s,
-        speaker_word_counts=dict(speaker_word_counts),
-        speaker_turn_counts=dict(speaker_turn_counts),
-        top_keywords=top_keywords,
-        total_words=total_words,
+        speaker_word_counts=speaker_word_counts,
+        speaker_turn_counts=speaker_turn_counts,
+        top_keywords=keyword_counter.most_common(12),
+        total_words=sum(speaker_word_counts.values()),
+        duration_mmss=sec_to_mmss(duration_s) if duration_s > 0 else "N/A",
+        speakers_sorted=sorted(speaker_word_counts.items(), key=lambda kv: kv[1], reverse=True),
     )
+    return stats, matches
 
 
-def build_quick_summary(named_lines: List[Tuple[str, str]], stats: MeetingStats) -> List[str]:
+def build_quick_summary(stats: MeetingStats, matches: Dict[str, List[Tuple[str, str]]]) -> List[str]:
     """
     Simple deterministic “executive summary” bullets.
     """
     bullets = []
 
     # Duration + participation
-    dur = sec_to_mmss(stats.duration_s) if stats.duration_s > 0 else "N/A"
-    bullets.append(f"Meeting length: {dur}.")
+    bullets.append(f"Meeting length: {stats.duration_mmss}.")
     if stats.total_words > 0 and stats.speaker_word_counts:
-        top = sorted(stats.speaker_word_counts.items(), key=lambda kv: kv[1], reverse=True)[:2]
+        top = stats.speakers_sorted[:2]
         if top:
             bullets.append(f"Most talk time (by words): {top[0][0]} ({top[0][1]} words)" + (f", then {top[1][0]} ({top[1][1]})." if len(top) > 1 else "."))
     if stats.top_keywords:
@@ -235,16 +342,13 @@ def build_quick_summary(named_lines: List[Tuple[str, str]], stats: MeetingStats)
         bullets.append(f"Top topics/keywords: {kw}.")
 
     # A couple “signal” bullets from content heuristics
-    joined = " ".join([t for _, t in named_lines])
-    # count “risk-ish” and “decision-ish”
-    risk_re = re.compile("|".join(RISK_PATTERNS), re.IGNORECASE)
-    decision_re = re.compile("|".join(DECISION_PATTERNS), re.IGNORECASE)
-    risks = len(risk_re.findall(joined))
-    decisions = len(decision_re.findall(joined))
+    # count “risk-ish” and “decision-ish” lines (already collected by analyze())
+    risks = len(matches["risks"])
+    decisions = len(matches["decisions"])
     if decisions:
-        bullets.append(f"Detected decision language {decisions} time(s).")
+        bullets.append(f"Detected decision language in {decisions} line(s).")
     if risks:
-        bullets.append(f"Detected risk/blocker language {risks} time(s).")
+        bullets.append(f"Detected risk/blocker language in {risks} line(s).")
 
     return bullets
 
@@ -253,6 +357,21 @@ def build_quick_summary(named_lines: List[Tuple[str, str]], stats: MeetingStats)
 # PDF Builder
 # ----------------------------
 
+def _build_styles():
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(name="H1", parent=styles["Heading1"], fontSize=16, leading=20, spaceAfter=10))
+    styles.add(ParagraphStyle(name="H2", parent=styles["Heading2"], fontSize=12.5, leading=16, spaceAfter=6))
+    styles.add(ParagraphStyle(name="Body", parent=styles["BodyText"], fontSize=10.5, leading=14))
+    styles.add(ParagraphStyle(name="Mono", parent=styles["BodyText"], fontName="Courier", fontSize=9.5, leading=12))
+    styles.add(ParagraphStyle(name="MyBullet", parent=styles["BodyText"], fontSize=10.5, leading=14, leftIndent=14, bulletIndent=6))
+    styles.add(ParagraphStyle(name="Small", parent=styles["BodyText"], fontSize=9, leading=12))
+    return styles
+
+
+# Built once at import and shared by every build_pdf() call.
+_STYLES = _build_styles()
+
+
 def build_pdf(
     out_pdf: Path,
     title: str,
@@ -273,13 +392,7 @@ def build_pdf(
         title=title,
     )
 
-    styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(name="H1", parent=styles["Heading1"], fontSize=16, leading=20, spaceAfter=10))
-    styles.add(ParagraphStyle(name="H2", parent=styles["Heading2"], fontSize=12.5, leading=16, spaceAfter=6))
-    styles.add(ParagraphStyle(name="Body", parent=styles["BodyText"], fontSize=10.5, leading=14))
-    styles.add(ParagraphStyle(name="Mono", parent=styles["BodyText"], fontName="Courier", fontSize=9.5, leading=12))
-    styles.add(ParagraphStyle(name="MyBullet", parent=styles["BodyText"], fontSize=10.5, leading=14, leftIndent=14, bulletIndent=6))
-    styles.add(ParagraphStyle(name="Small", parent=styles["BodyText"], fontSize=9, leading=12))
+    styles = _STYLES
 
     story = []
 
@@ -295,28 +408,17 @@ def build_pdf(
 
     # Metrics table
     story.append(Paragraph("Participation Metrics", styles["H2"]))
-    dur = sec_to_mmss(stats.duration_s) if stats.duration_s > 0 else "N/A"
-    story.append(Paragraph(f"Meeting length: {dur}", styles["Body"]))
+    story.append(Paragraph(f"Meeting length: {stats.duration_mmss}", styles["Body"]))
     story.append(Spacer(1, 6))
 
-    # Build speaker table - use Paragraph objects for proper text wrapping
-    rows = [[Paragraph("Speaker", styles["Body"]), 
-             Paragraph("Turns", styles["Body"]), 
-             Paragraph("Words", styles["Body"]), 
-             Paragraph("Share", styles["Body"])]]
+    # Build speaker table - only the speaker column needs Paragraph wrapping;
+    # short numeric cells stay plain strings (TableStyle fonts/alignment apply)
+    rows = [["Speaker", "Turns", "Words", "Share"]]
     total = max(1, stats.total_words)
-    speakers_sorted = sorted(stats.speaker_word_counts.items(), key=lambda kv: kv[1], reverse=True)
-
-    for spk, wc in speakers_sorted:
+    for spk, wc in stats.speakers_sorted:
         turns = stats.speaker_turn_counts.get(spk, 0)
         share = f"{(100.0 * wc / total):.1f}%"
-        # Use Paragraph objects so text wraps properly (especially speaker names)
-        rows.append([
-            Paragraph(spk, styles["Body"]), 
-            Paragraph(str(turns), styles["Body"]), 
-            Paragraph(str(wc), styles["Body"]), 
-            Paragraph(share, styles["Body"])
-        ])
+        rows.append([Paragraph(escape(spk), styles["Body"]), str(turns), str(wc), share])
 
     tbl = Table(rows, colWidths=[2.2 * inch, 0.9 * inch, 0.9 * inch, 0.9 * inch], repeatRows=1)
     tbl.setStyle(TableStyle([
@@ -372,13 +474,10 @@ def build_pdf(
     story.append(Paragraph("Named Transcript", styles["H1"]))
     story.append(Spacer(1, 8))
 
-    # Render transcript blocks
+    # Render transcript blocks: one Paragraph per turn, normal flow handles page breaks
     for spk, txt in named_lines:
-        story.append(KeepTogether([
-            Paragraph(f"<b>{spk}</b>", styles["Body"]),
-            Paragraph(txt, styles["Body"]),
-            Spacer(1, 8),
-        ]))
+        story.append(Paragraph(f"<b>{escape(spk)}</b><br/>{escape(txt)}", styles["Body"]))
+        story.append(Spacer(1, 8))
 
     doc.build(story)
 
@@ -422,9 +521,8 @@ def main():
     if not named_lines:
         raise SystemExit(f"No transcript lines found in: {named_script_path}")
 
-    stats = compute_stats(named_lines, utterances)
-    matches = find_matches(named_lines)
-    summary = build_quick_summary(named_lines, stats)
+    stats, matches = analyze(named_lines, utterances)
+    summary = build_quick_summary(stats, matches)
 
     build_pdf(
         out_pdf=out_pdf,
@@ -6,6 +6,7 @@ import sys
 import time
 import json
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from watchdog.observers import Observer
@@ -42,16 +43,34 @@ def ensure_dirs():
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     ENROLL_DIR.mkdir(parents=True, exist_ok=True)
 
+# (st_mtime_ns, st_size) -> parsed contents; re-read only when the file changes
+_CONFIG_CACHE = {"sig": None, "data": None}
+_DB_CACHE = {"sig": None, "data": None}
+
+def _file_sig(path: Path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
 def load_config() -> dict:
-    if CONFIG_PATH.exists():
+    sig = _file_sig(CONFIG_PATH)
+    if sig is None:
+        return DEFAULT_CONFIG.copy()
+    if _CONFIG_CACHE["sig"] != sig:
         try:
-            return {**DEFAULT_CONFIG, **json.loads(CONFIG_PATH.read_text(encoding="utf-8"))}
+            data = {**DEFAULT_CONFIG, **json.loads(CONFIG_PATH.read_text(encoding="utf-8"))}
         except Exception:
-            return DEFAULT_CONFIG.copy()
-    return DEFAULT_CONFIG.copy()
+            data = DEFAULT_CONFIG.copy()
+        _CONFIG_CACHE["sig"], _CONFIG_CACHE["data"] = sig, data
+    # callers edit and save the returned dict; never hand out the cached one
+    return dict(_CONFIG_CACHE["data"])
 
 def save_config(cfg: dict):
     CONFIG_PATH.write_text(json.dumps(cfg, indent=2), encoding="utf-8")
+    # a same-size rewrite within the mtime granularity would keep the old sig
+    _CONFIG_CACHE["sig"] = _CONFIG_CACHE["data"] = None
 
 def norm_name(first: str, last: str) -> str:
     first = (first or "").strip().lower()
@@ -88,16 +107,21 @@ def is_temporary_file(path: Path) -> bool:
     )
 
 def file_is_stable(path: Path, stable_seconds: int, checks: int) -> bool:
+    # one stat() per check (exists() would be a second syscall)
     last = -1
     for _ in range(checks):
-        if not path.exists():
+        try:
+            size = os.stat(path).st_size
+        except OSError:
             return False
-        size = path.stat().st_size
         if size != last:
             last = size
         time.sleep(stable_seconds)
     # final check
-    return path.exists() and path.stat().st_size == last
+    try:
+        return os.stat(path).st_size == last
+    except OSError:
+        return False
 
 
 # ----------------------------
@@ -112,6 +136,9 @@ def init_db_if_missing():
 
 def read_db() -> dict:
     init_db_if_missing()
+    sig = _file_sig(DB_CSV)
+    if sig is not None and _DB_CACHE["sig"] == sig:
+        return {k: dict(v) for k, v in _DB_CACHE["data"].items()}
     people = {}
     with open(DB_CSV, "r", newline="", encoding="utf-8") as f:
         r = csv.DictReader(f)
@@ -123,16 +150,20 @@ def read_db() -> dict:
                 continue
             key = norm_name(first, last)
             people[key] = {"first": first, "last": last, "email": email}
-    return people
+    _DB_CACHE["sig"], _DB_CACHE["data"] = sig, people
+    return {k: dict(v) for k, v in people.items()}
 
 def write_db(people: dict):
     init_db_if_missing()
-    rows = sorted(people.values(), key=lambda x: (x["last"].lower(), x["first"].lower()))
+    rows = [
+        (p["first"], p["last"], p["email"])
+        for p in sorted(people.values(), key=lambda x: (x["last"].lower(), x["first"].lower()))
+    ]
     with open(DB_CSV, "w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=["first", "last", "email"])
-        w.writeheader()
-        for row in rows:
-            w.writerow(row)
+        w = csv.writer(f)
+        w.writerow(("first", "last", "email"))
+        w.writerows(rows)
+    _DB_CACHE["sig"] = _DB_CACHE["data"] = None
 
 def add_or_edit_person():
     ensure_dirs()
@@ -257,9 +288,12 @@ def run_meeting_pipeline(audio_path: Path, cfg: dict):
 # Watcher
 # ----------------------------
 class Handler(FileSystemEventHandler):
-    def __init__(self, cfg: dict):
+    def __init__(self, cfg: dict, max_workers: int = 4):
         super().__init__()
         self.cfg = cfg
+        # Stability polling + pipeline run off the observer thread, so files
+        # dropped together are processed in parallel instead of queueing.
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dio-pipeline")
 
     def on_created(self, event):
         if event.is_directory:
@@ -273,16 +307,24 @@ class Handler(FileSystemEventHandler):
 
         print(f"\n📥 New file detected: {path.name}")
         print("   Waiting for Box sync to finish...")
+        self.pool.submit(self._stabilize_and_run, path)
 
+    def _stabilize_and_run(self, path: Path):
         stable_seconds = int(self.cfg.get("stable_seconds", 6))
         stable_checks = int(self.cfg.get("stable_checks", 4))
 
-        if file_is_stable(path, stable_seconds=stable_seconds, checks=stable_checks):
-            print("   File stable. Running pipeline.")
-            run_meeting_pipeline(path, self.cfg)
-            print("\n👀 Still watching for the next file...")
-        else:
-            print("   File never became stable (moved/renamed/deleted). Skipping.")
+        try:
+            if file_is_stable(path, stable_seconds=stable_seconds, checks=stable_checks):
+                print(f"   File stable: {path.name}. Running pipeline.")
+                run_meeting_pipeline(path, self.cfg)
+                print("\n👀 Still watching for the next file...")
+            else:
+                print(f"   {path.name} never became stable (moved/renamed/deleted). Skipping.")
+        except Exception as e:
+            print(f"\n❌ Pipeline error for {path.name}: {e}")
+
+    def shutdown(self):
+        self.pool.shutdown(wait=True)
 
 
 def run_watcher_forever(cfg: dict):
@@ -293,8 +335,9 @@ def run_watcher_forever(cfg: dict):
     print(f"\n👀 Watching folder:\n  {watch_dir.resolve()}")
     print("Leave this window open. Press Ctrl+C to stop.\n")
 
+    handler = Handler(cfg)
     observer = Observer()
-    observer.schedule(Handler(cfg), str(watch_dir), recursive=False)
+    observer.schedule(handler, str(watch_dir), recursive=False)
     observer.start()
     try:
         while True:
@@ -302,6 +345,7 @@ def run_watcher_forever(cfg: dict):
     except KeyboardInterrupt:
         observer.stop()
     observer.join()
+    handler.shutdown()
 
 
 # ----------------------------
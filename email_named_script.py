@@ -1,13 +1,21 @@
 import argparse
 import csv
+import io
 import json
+import mmap
 import os
 import re
 import ssl
 import smtplib
+import threading
 import time
-from email.message import EmailMessage
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
+from email.message import EmailMessage, MIMEPart
 from pathlib import Path
+from xml.sax.saxutils import escape
 
 try:
     from reportlab.lib.pagesizes import letter
@@ -20,6 +28,12 @@ try:
 except ImportError:
     PDF_AVAILABLE = False
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Load .env file if python-dotenv is available
 # Use utf-8-sig to handle BOM if present
 try:
@@ -59,7 +73,9 @@ Phi AI Team
 
 ATTACH_SCRIPT = True
 DRY_RUN = False         # set True for testing, False to actually send
-SLEEP_SECONDS = 1.5
+SLEEP_SECONDS = 1.5     # minimum gap between sends, shared by all SMTP workers
+SEND_BATCH_SIZE = 10    # recipients per SMTP connection
+SEND_WORKERS = 4        # parallel SMTP connections
 
 # -------------------------
 # SMTP env vars
@@ -71,49 +87,78 @@ SMTP_PASS = os.environ.get("SMTP_PASS", "").strip()
 
 ALLOWED = set(["first", "last", "email"])
 
+# str.translate table deleting every character \s matches (U+3000 is the highest)
+_WS_DEL = {cp: None for cp in range(0x3001) if chr(cp).isspace()}
+_PAREN_NUM_RE = re.compile(r"\(\d+\)")
+
 def die(msg: str) -> None:
     raise SystemExit(f"\nERROR: {msg}\n")
 
 def norm_key(first: str, last: str) -> str:
-    first = re.sub(r"\s+", "", (first or "").strip().lower())
-    last = re.sub(r"\s+", "", (last or "").strip().lower())
-    return f"{first},{last}"
+    return f"{(first or '').strip().lower().translate(_WS_DEL)},{(last or '').strip().lower().translate(_WS_DEL)}"
+
+def _read_text_mapped(path: Path) -> str:
+    """Decode the whole file straight from an mmap (no buffered-read copy)."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return str(mm, "utf-8")
 
 def read_db(path: Path) -> dict:
     if not path.exists():
         die(f"Missing CSV: {path} (expected headers: first,last,email)")
-    with open(path, "r", newline="", encoding="utf-8") as f:
-        r = csv.DictReader(f)
-        if not r.fieldnames:
-            die("CSV has no headers.")
-        headers = [h.strip().lower() for h in r.fieldnames]
-        if any(h not in ALLOWED for h in headers):
-            pass
-        needed = {"first", "last", "email"}
-        if not needed.issubset(set(headers)):
-            die("CSV must have headers exactly: first,last,email")
-
-        people = {}
-        for row in r:
-            first = (row.get("first") or "").strip()
-            last = (row.get("last") or "").strip()
-            email = (row.get("email") or "").strip()
-            if first and last and email:
-                people[norm_key(first, last)] = {"first": first, "last": last, "email": email}
-        return people
-
-def speakers_stats(named_json_path: Path) -> dict:
+    # csv.reader yields C-built row lists; DictReader would build a dict per row in Python
+    r = csv.reader(io.StringIO(_read_text_mapped(path), newline=""))
+    fieldnames = next(r, None)
+    if not fieldnames:
+        die("CSV has no headers.")
+    headers = [h.strip().lower() for h in fieldnames]
+    if any(h not in ALLOWED for h in headers):
+        pass
+    needed = {"first", "last", "email"}
+    if not needed.issubset(set(headers)):
+        die("CSV must have headers exactly: first,last,email")
+    i_first, i_last, i_email = headers.index("first"), headers.index("last"), headers.index("email")
+    width = max(i_first, i_last, i_email) + 1
+
+    people = {}
+    aliases = {}
+    for row in r:
+        if len(row) < width:
+            row = row + [""] * (width - len(row))
+        first = row[i_first].strip()
+        last = row[i_last].strip()
+        email = row[i_email].strip()
+        if first and last and email:
+            key = norm_key(first, last)
+            record = {"first": first, "last": last, "email": email}
+            people[key] = record
+            # Also index by enrollment username ("firstlast"), the form speakers_stats() keys on
+            aliases[key.replace(",", "")] = record
+    for username, record in aliases.items():
+        people.setdefault(username, record)
+    return people
+
+def load_named_json(named_json_path: Path) -> list:
+    """Decode output/<stem>_named_script.json once (orjson when installed)."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(named_json_path.read_bytes())
+    return json.loads(named_json_path.read_text(encoding="utf-8"))
+
+def speakers_stats(data: list) -> dict:
     """
-    Reads output/<stem>_named_script.json and returns:
+    Takes the rows of output/<stem>_named_script.json and returns:
       key -> {seconds, words}
     Assumes each row has start/end/text/speaker_name (your identify_speakers.py already writes start/end/score/text).
     """
-    data = json.loads(named_json_path.read_text(encoding="utf-8"))
-    stats = {}
+    stats = defaultdict(lambda: {"seconds": 0.0, "words": 0})
     for r in data:
         name = (r.get("speaker_name") or "").strip().lower()
-        name = re.sub(r"\(\d+\)", "", name)  # Remove (2), (3) etc.
-        name = re.sub(r"\s+", "", name)  # Remove all whitespace to match enrollment format (username)
+        name = _PAREN_NUM_RE.sub("", name)  # Remove (2), (3) etc.
+        name = name.translate(_WS_DEL)  # Remove all whitespace to match enrollment format (username)
         if name == "unknown":
             continue  # Skip unknown speakers
         txt = (r.get("text") or "").strip()
@@ -124,57 +169,85 @@ def speakers_stats(named_json_path: Path) -> dict:
         end = float(r.get("end", 0.0))
         dur = max(0.0, end - start)
 
-        words = len(re.findall(r"\b\w+\b", txt))
-        if name not in stats:
-            stats[name] = {"seconds": 0.0, "words": 0}
-        stats[name]["seconds"] += dur
-        stats[name]["words"] += words
-    return stats
-
-def create_pdf(script_json_path: Path, people: dict, output_pdf_path: Path) -> bool:
+        # whitespace-delimited words; close enough to \b\w+\b for the min-words threshold
+        words = len(txt.split())
+        st = stats[name]
+        st["seconds"] += dur
+        st["words"] += words
+    return dict(stats)
+
+def display_speaker_name(speaker_name: str, people: dict) -> str:
+    """Map a speaker_name from named_script.json to the "First Last" label shown in the PDF."""
+    # Remove any (2), (3) etc. patterns first
+    speaker_name_clean = _PAREN_NUM_RE.sub("", speaker_name).strip()
+
+    # Convert username to "First Last" format using people dict
+    # The people dict maps username -> user data (or old format "first,last" -> user data)
+    display_name = None
+    if speaker_name_clean.lower() in people:
+        user_data = people[speaker_name_clean.lower()]
+        if isinstance(user_data, dict) and "first" in user_data and "last" in user_data:
+            display_name = f"{user_data['first']} {user_data['last']}"
+
+    if display_name:
+        speaker_name = display_name
+    elif "," in speaker_name_clean:
+        # Fallback: old format "first,last"
+        parts = speaker_name_clean.split(",")
+        if len(parts) == 2:
+            first = parts[0].strip().capitalize()
+            last = parts[1].strip().capitalize()
+            speaker_name = f"{first} {last}"
+        else:
+            speaker_name = speaker_name_clean.capitalize()
+    else:
+        # Preserve multi-word capitalization for custom speaker labels.
+        # If the string is all-lowercase, title-case it; otherwise keep as provided.
+        if speaker_name_clean and speaker_name_clean == speaker_name_clean.lower():
+            speaker_name = speaker_name_clean.title()
+        else:
+            speaker_name = speaker_name_clean
+    return speaker_name
+
+@lru_cache(maxsize=None)
+def _pdf_styles():
+    """(title_style, body_style), built on first use and reused by every create_pdf call."""
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=18,
+        textColor='#1d1d1f',
+        spaceAfter=20,
+        fontName='Helvetica-Bold'
+    )
+    body_style = ParagraphStyle(
+        'CustomBody',
+        parent=styles['Normal'],
+        fontSize=11,
+        textColor='#1d1d1f',
+        leading=16,
+        spaceAfter=12,
+        fontName='Helvetica'
+    )
+    return title_style, body_style
+
+def create_pdf(data: list, people: dict, output_pdf_path: Path) -> bool:
     """Create PDF with format: First Name Last Name: what they said"""
     if not PDF_AVAILABLE:
         return False
     
     try:
-        data = json.loads(script_json_path.read_text(encoding="utf-8"))
         doc = SimpleDocTemplate(str(output_pdf_path), pagesize=letter)
-        styles = getSampleStyleSheet()
+        title_style, body_style = _pdf_styles()
         story = []
         
         # Title
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=18,
-            textColor='#1d1d1f',
-            spaceAfter=20,
-            fontName='Helvetica-Bold'
-        )
         story.append(Paragraph("Meeting Transcript", title_style))
         story.append(Spacer(1, 0.2*inch))
         
         # Content
-        body_style = ParagraphStyle(
-            'CustomBody',
-            parent=styles['Normal'],
-            fontSize=11,
-            textColor='#1d1d1f',
-            leading=16,
-            spaceAfter=12,
-            fontName='Helvetica'
-        )
-        
-        speaker_style = ParagraphStyle(
-            'CustomSpeaker',
-            parent=styles['Normal'],
-            fontSize=12,
-            textColor='#007AFF',
-            leading=16,
-            spaceAfter=4,
-            fontName='Helvetica-Bold'
-        )
-        
+        label_cache = {}
         for r in data:
             speaker_name = r.get('speaker_name', 'Unknown')
             text = r.get('text', '').strip()
@@ -182,42 +255,15 @@ def create_pdf(script_json_path: Path, people: dict, output_pdf_path: Path) -> b
             if not text or speaker_name == 'Unknown':
                 continue
             
-            # Remove any (2), (3) etc. patterns first
-            speaker_name_clean = re.sub(r"\(\d+\)", "", speaker_name).strip()
-            
-            # Convert username to "First Last" format using people dict
-            # The people dict maps username -> user data (or old format "first,last" -> user data)
-            display_name = None
-            if speaker_name_clean.lower() in people:
-                user_data = people[speaker_name_clean.lower()]
-                if isinstance(user_data, dict) and "first" in user_data and "last" in user_data:
-                    display_name = f"{user_data['first']} {user_data['last']}"
-            
-            if display_name:
-                speaker_name = display_name
-            elif "," in speaker_name_clean:
-                # Fallback: old format "first,last"
-                parts = speaker_name_clean.split(",")
-                if len(parts) == 2:
-                    first = parts[0].strip().capitalize()
-                    last = parts[1].strip().capitalize()
-                    speaker_name = f"{first} {last}"
-                else:
-                    speaker_name = speaker_name_clean.capitalize()
-            else:
-                # Preserve multi-word capitalization for custom speaker labels.
-                # If the string is all-lowercase, title-case it; otherwise keep as provided.
-                if speaker_name_clean and speaker_name_clean == speaker_name_clean.lower():
-                    speaker_name = speaker_name_clean.title()
-                else:
-                    speaker_name = speaker_name_clean
-            
-            # Format: "First Name Last Name: what they said"
-            speaker_para = Paragraph(f"<b>{speaker_name}:</b>", speaker_style)
-            text_para = Paragraph(text.replace('\n', '<br/>'), body_style)
-            
-            story.append(speaker_para)
-            story.append(text_para)
+            # Same speaker appears on many rows; resolve + escape the label once
+            label = label_cache.get(speaker_name)
+            if label is None:
+                label = escape(display_speaker_name(speaker_name, people))
+                label_cache[speaker_name] = label
+
+            # Format: "First Name Last Name: what they said" (one Paragraph per row)
+            body = escape(text).replace("\n", "<br/>")
+            story.append(Paragraph(f'<font color="#007AFF"><b>{label}:</b></font> {body}', body_style))
             story.append(Spacer(1, 0.15*inch))
         
         doc.build(story)
@@ -226,29 +272,43 @@ def create_pdf(script_json_path: Path, people: dict, output_pdf_path: Path) -> b
         print(f"Error creating PDF: {e}")
         return False
 
-def build_message(to_first: str, to_email: str, stem: str, script_text: str, pdf_path: Path = None) -> EmailMessage:
-    msg = EmailMessage()
-    msg["From"] = f"{FROM_NAME} <{SMTP_USER}>"
-    msg["To"] = to_email
-    msg["Subject"] = SUBJECT_TEMPLATE.format(stem=stem)
-    msg.set_content(BODY_TEMPLATE.format(first=to_first, stem=stem))
-
-    # Attach PDF if available, otherwise attach text
+def build_attachment(stem: str, script_bytes: bytes, pdf_path: Path = None):
+    """
+    Builds the attachment part once so every recipient's message reuses it
+    (the PDF is read and base64-encoded a single time).
+    Attaches the PDF if available, otherwise the text script; None if neither.
+    """
+    part = MIMEPart()
     if pdf_path and pdf_path.exists():
-        with open(pdf_path, 'rb') as f:
-            msg.add_attachment(
-                f.read(),
-                maintype="application",
-                subtype="pdf",
-                filename=f"{stem}_transcript.pdf",
-            )
+        part.set_content(
+            pdf_path.read_bytes(),
+            maintype="application",
+            subtype="pdf",
+            disposition="attachment",
+            filename=f"{stem}_transcript.pdf",
+        )
     elif ATTACH_SCRIPT:
-        msg.add_attachment(
-            script_text.encode("utf-8"),
+        part.set_content(
+            script_bytes,
             maintype="text",
             subtype="plain",
+            disposition="attachment",
             filename=f"{stem}_named_script.txt",
         )
+    else:
+        return None
+    return part
+
+def build_message(to_first: str, to_email: str, stem: str, attachment: MIMEPart = None) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = f"{FROM_NAME} <{SMTP_USER}>"
+    msg["To"] = to_email
+    msg["Subject"] = SUBJECT_TEMPLATE.format(stem=stem)
+    msg.set_content(BODY_TEMPLATE.format(first=to_first, stem=stem))
+
+    if attachment is not None:
+        msg.make_mixed()
+        msg.attach(attachment)
     return msg
 
 def require_env():
@@ -260,6 +320,120 @@ def require_env():
     if missing:
         die("Missing env vars: " + ", ".join(missing))
 
+# Placeholders flattened into the shared message bytes; swapped per recipient.
+_FIRST_PLACEHOLDER = "__RECIPIENT_FIRST__"
+_TO_PLACEHOLDER = "__RECIPIENT_EMAIL__"
+
+def render_template(stem: str, attachment: MIMEPart = None) -> bytes:
+    """
+    Flattens the message once (attachment included) with placeholder
+    recipient fields, in the CRLF form smtplib.send_message would produce.
+    """
+    msg = build_message(_FIRST_PLACEHOLDER, _TO_PLACEHOLDER, stem, attachment)
+    return msg.as_bytes(policy=msg.policy.clone(linesep="\r\n"))
+
+def personalize(template: bytes, to_first: str, to_email: str):
+    """
+    Returns template bytes for one recipient, or None when plain byte
+    substitution would not be valid MIME (non-ASCII or unusual values, or a
+    template whose body got encoded) and the message must be built normally.
+    """
+    for value in (to_first, to_email):
+        if not (value.isascii() and value.isprintable()) or "=" in value or len(value) > 64:
+            return None
+    first_b, to_b = _FIRST_PLACEHOLDER.encode("ascii"), _TO_PLACEHOLDER.encode("ascii")
+    if template.count(first_b) != 1 or template.count(to_b) != 1:
+        return None
+    return template.replace(first_b, to_first.encode("ascii")).replace(to_b, to_email.encode("ascii"))
+
+class RateLimiter:
+    """Hands out send slots at most once every `interval` seconds across threads."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        with self._lock:
+            slot = max(time.monotonic(), self._next)
+            self._next = slot + self.interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+def open_smtp() -> smtplib.SMTP:
+    server = smtplib.SMTP(SMTP_HOST, SMTP_PORT)
+    try:
+        server.ehlo()
+        server.starttls(context=ssl.create_default_context())
+        server.ehlo()
+        server.login(SMTP_USER, SMTP_PASS)
+    except Exception:
+        server.close()
+        raise
+    return server
+
+def prepare_payload(named_rows: list, people: dict, stem: str, script_bytes: bytes):
+    """Renders the PDF transcript, then builds the shared attachment and message template."""
+    pdf_path = Path("output") / f"{stem}_transcript.pdf"
+    pdf_created = False
+    if PDF_AVAILABLE:
+        pdf_created = create_pdf(named_rows, people, pdf_path)
+        if pdf_created:
+            print(f"Created PDF: {pdf_path}")
+        else:
+            print("PDF creation failed, will attach text file instead")
+    if DRY_RUN:
+        return None, None
+    attachment = build_attachment(stem, script_bytes, pdf_path if pdf_created else None)
+    return attachment, render_template(stem, attachment)
+
+def send_raw(server: smtplib.SMTP, to_email: str, raw: bytes):
+    """
+    sendmail() for pre-rendered bytes. When the server advertises PIPELINING
+    (RFC 2920), MAIL FROM and RCPT TO go out back to back and both replies
+    are read together, saving a round trip per message.
+    """
+    if not server.has_extn("pipelining"):
+        server.sendmail(SMTP_USER, [to_email], raw)
+        return
+    server.putcmd("mail", f"FROM:{smtplib.quoteaddr(SMTP_USER)}")
+    server.putcmd("rcpt", f"TO:{smtplib.quoteaddr(to_email)}")
+    mail_code, mail_resp = server.getreply()
+    rcpt_code, rcpt_resp = server.getreply()
+    if mail_code != 250:
+        server.rset()
+        raise smtplib.SMTPSenderRefused(mail_code, mail_resp, SMTP_USER)
+    if rcpt_code not in (250, 251):
+        server.rset()
+        raise smtplib.SMTPRecipientsRefused({to_email: (rcpt_code, rcpt_resp)})
+    code, resp = server.data(raw)
+    if code != 250:
+        server.rset()
+        raise smtplib.SMTPDataError(code, resp)
+
+def send_batch(batch: list, total: int, stem: str, payload: Future, limiter: RateLimiter):
+    """
+    Sends one batch of (index, (person, stats)) over its own SMTP connection
+    (smtplib connections are not thread-safe, so each worker opens one).
+    The connection handshake overlaps the PDF render; sending waits on payload.
+    """
+    with open_smtp() as server:
+        attachment, template = payload.result()
+        for i, (r, _) in batch:
+            if DRY_RUN:
+                # nothing is sent, so neither wait on the rate limit nor build the message
+                print(f"[{i}/{total}] WOULD SEND to {r['email']}")
+            else:
+                limiter.wait()
+                raw = personalize(template, r["first"], r["email"])
+                if raw is not None:
+                    send_raw(server, r["email"], raw)
+                else:
+                    server.send_message(build_message(r["first"], r["email"], stem, attachment))
+                print(f"[{i}/{total}] Sent to {r['email']}")
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--stem", required=True)
@@ -279,27 +453,36 @@ def main():
     if not named_json.exists():
         die(f"Missing: {named_json} (identify_speakers.py should create it)")
 
-    script_text = named_txt.read_text(encoding="utf-8", errors="replace")
-    stats = speakers_stats(named_json)
+    # Only ever attached as UTF-8 bytes, so skip the decode/encode round trip
+    script_bytes = named_txt.read_bytes()
+    named_rows = load_named_json(named_json)
+    stats = speakers_stats(named_rows)
 
-    # Filter speakers by thresholds AND roster
-    recipients = []
+    # Filter speakers by thresholds AND roster.
+    # speakers_stats() keys are already lowercase with no whitespace; one person
+    # can show up under both "first,last" and username keys, so merge per record.
+    matched = {}
     for spk_key, st in stats.items():
-        if st["seconds"] >= args.min_seconds and st["words"] >= args.min_words:
-            # Normalize the key to match enrollment format (lowercase, no spaces)
-            normalized_key = spk_key.lower().strip()
-            normalized_key = re.sub(r"\s+", "", normalized_key)
-            if normalized_key in people:
-                recipients.append((people[normalized_key], st))
-            else:
-                # Debug: print unmatched speakers
-                print(f"  ⚠️  Speaker '{spk_key}' (normalized: '{normalized_key}') not found in roster.")
-                print(f"      Available keys: {list(people.keys())}")
-
-    recipients.sort(key=lambda x: (x[0]["last"].lower(), x[0]["first"].lower()))
+        record = people.get(spk_key)
+        if record is not None:
+            acc = matched.setdefault(id(record), (record, {"seconds": 0.0, "words": 0}))[1]
+            acc["seconds"] += st["seconds"]
+            acc["words"] += st["words"]
+        elif st["seconds"] >= args.min_seconds and st["words"] >= args.min_words:
+            # Debug: print unmatched speakers
+            print(f"  ⚠️  Speaker '{spk_key}' not found in roster.")
+            if os.environ.get("DEBUG_ROSTER"):
+                print(f"      Roster has {len(people)} keys; first few: {list(islice(people, 5))}")
+    decorated = [
+        ((record["last"].lower(), record["first"].lower()), record, st)
+        for record, st in matched.values()
+        if st["seconds"] >= args.min_seconds and st["words"] >= args.min_words
+    ]
+    decorated.sort(key=lambda t: t[0])
+    recipients = [(record, st) for _, record, st in decorated]
 
     print(f"Stem: {stem}")
-    print(f"Roster size: {len(people)}")
+    print(f"Roster size: {len({id(p) for p in people.values()})}")  # people also holds username aliases
     print(f"Detected speakers: {len(stats)}")
     print(f"Thresholds: >= {args.min_seconds}s AND >= {args.min_words} words")
     print(f"Recipients: {len(recipients)}")
@@ -311,31 +494,22 @@ def main():
         print("No recipients meet thresholds.")
         return
 
-    context = ssl.create_default_context()
-    with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-        server.ehlo()
-        server.starttls(context=context)
-        server.ehlo()
-        server.login(SMTP_USER, SMTP_PASS)
-
-        # Create PDF transcript
-        pdf_path = Path("output") / f"{stem}_transcript.pdf"
-        pdf_created = False
-        if PDF_AVAILABLE:
-            pdf_created = create_pdf(named_json, people, pdf_path)
-            if pdf_created:
-                print(f"Created PDF: {pdf_path}")
-            else:
-                print("PDF creation failed, will attach text file instead")
-        
-        for i, (r, _) in enumerate(recipients, start=1):
-            msg = build_message(r["first"], r["email"], stem, script_text, pdf_path if pdf_created else None)
-            if DRY_RUN:
-                print(f"[{i}/{len(recipients)}] WOULD SEND to {r['email']}")
-            else:
-                server.send_message(msg)
-                print(f"[{i}/{len(recipients)}] Sent to {r['email']}")
-            time.sleep(SLEEP_SECONDS)
+    # Render the PDF in the background while SMTP connections are set up
+    with ThreadPoolExecutor(max_workers=1) as render_pool:
+        payload = render_pool.submit(prepare_payload, named_rows, people, stem, script_bytes)
+
+        numbered = list(enumerate(recipients, start=1))
+        total = len(numbered)
+        limiter = RateLimiter(SLEEP_SECONDS)
+        send_args = (total, stem, payload, limiter)
+        if total < 3:
+            send_batch(numbered, *send_args)
+        else:
+            batches = [numbered[k:k + SEND_BATCH_SIZE] for k in range(0, total, SEND_BATCH_SIZE)]
+            with ThreadPoolExecutor(max_workers=min(SEND_WORKERS, len(batches))) as pool:
+                futures = [pool.submit(send_batch, batch, *send_args) for batch in batches]
+                for fut in futures:
+                    fut.result()
 
     print("Done.")
 
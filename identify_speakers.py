@@ -4,7 +4,7 @@
 #
 # Requirements:
 #   pip install speechbrain torch torchaudio soundfile numpy
-#   ffmpeg in PATH (for converting + slicing)
+#   ffmpeg in PATH (fallback decoder for enrollment formats torchaudio can't read)
 
 # IMPORTANT: Limit ALL threading libraries to prevent stack overflow on M1/M2 Macs
 # This MUST be set BEFORE importing numpy, torch, or speechbrain
@@ -18,12 +18,24 @@ os.environ["TORCH_NUM_THREADS"] = "1"
 os.environ["GOTO_NUM_THREADS"] = "1"  # GotoBLAS (OpenBLAS predecessor)
 os.environ["BLIS_NUM_THREADS"] = "1"  # BLIS library
 
+import contextlib
+import functools
+import getpass
+import hashlib
+import io
 import json
 import math
 import os
 import re
+import socket
+import socketserver
+import stat
 import subprocess
 import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from operator import itemgetter
 from pathlib import Path
 
 # Load environment variables from .env (for HF_TOKEN)
@@ -46,6 +58,7 @@ if hf_token:
         pass
 
 import numpy as np
+import soundfile as sf
 import torch
 
 # Force single-threaded PyTorch operations to prevent stack overflow
@@ -60,131 +73,211 @@ except Exception:
     from speechbrain.pretrained import EncoderClassifier  # type: ignore
 
 
-def run(cmd):
-    p = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
-    if p.returncode != 0:
-        print(p.stdout)
-        raise RuntimeError(f"Command failed: {' '.join(cmd)}")
-
-
-def to_wav_16k_mono(in_path: Path, out_path: Path):
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    run([
-        "ffmpeg", "-y",
-        "-i", str(in_path),
-        "-vn",
-        "-ac", "1",
-        "-ar", "16000",
-        "-c:a", "pcm_s16le",
-        str(out_path),
-    ])
-
-
-def slice_wav(in_wav: Path, start_s: float, end_s: float, out_wav: Path):
-    out_wav.parent.mkdir(parents=True, exist_ok=True)
-    dur = max(0.01, end_s - start_s)
-    run([
-        "ffmpeg", "-y",
-        "-ss", f"{start_s:.3f}",
-        "-t", f"{dur:.3f}",
-        "-i", str(in_wav),
-        "-ac", "1",
-        "-ar", "16000",
-        "-c:a", "pcm_s16le",
-        str(out_wav),
-    ])
-
-
-def cosine(a: np.ndarray, b: np.ndarray) -> float:
-    a = a / (np.linalg.norm(a) + 1e-9)
-    b = b / (np.linalg.norm(b) + 1e-9)
-    return float(np.dot(a, b))
+SAMPLE_RATE = 16000
+MIN_EMBED_SECONDS = 1.0  # shorter segments don't vote if their speaker has longer ones
+SILENCE_RMS = 1e-3  # segments quieter than this (full scale = 1.0) are never embedded
+_PAREN_NUM_RE = re.compile(r"\(\d+\)")  # the (2), (3) suffix on duplicate enrollment files
 
 import torch
 import torchaudio
 
-def embed(classifier, wav_path):
+def ffmpeg_decode_16k_mono(path: Path) -> torch.Tensor:
+    """One ffmpeg decode of any container to a 1D 16k float waveform, piped straight into memory."""
+    p = subprocess.run(
+        ["ffmpeg", "-v", "error", "-i", str(path), "-vn",
+         "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "f32le", "-"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    if p.returncode != 0:
+        print(p.stderr.decode("utf-8", errors="replace"))
+        raise RuntimeError(f"Could not decode audio: {path}")
+    return torch.from_numpy(np.frombuffer(p.stdout, dtype=np.float32).copy())
+
+
+def load_meeting_16k(path: Path) -> torch.Tensor:
     """
-    Returns a 1D numpy embedding for an audio file path.
-    Loads audio -> converts to mono -> resamples to 16k -> encode_batch().
+    Returns the whole meeting as a 1D 16k float waveform. A plain wav is read
+    with soundfile; anything libsndfile can't parse gets one ffmpeg decode.
     """
-    wav_path = str(wav_path)
-
-    # Load audio: waveform shape [channels, time]
-    waveform, sr = torchaudio.load(wav_path)
+    try:
+        wav_np, sr = sf.read(str(path), dtype="float32")
+    except RuntimeError:
+        return ffmpeg_decode_16k_mono(path)
+    meeting_t = torch.from_numpy(wav_np)
+    if meeting_t.dim() > 1:
+        meeting_t = meeting_t.mean(dim=1)
+    if sr != SAMPLE_RATE:
+        meeting_t = torchaudio.functional.resample(meeting_t, sr, SAMPLE_RATE)
+    return meeting_t
+
+
+def load_16k_mono(path: Path) -> torch.Tensor:
+    """
+    Returns a [1, time] float waveform at 16k for an audio/video file.
+    Decodes in-process with torchaudio; containers it can't open fall back
+    to a single ffmpeg decode piped straight into memory.
+    """
+    try:
+        waveform, sr = torchaudio.load(str(path))
+    except Exception:
+        return ffmpeg_decode_16k_mono(path).unsqueeze(0)
 
     # Convert to mono if needed
     if waveform.shape[0] > 1:
         waveform = waveform.mean(dim=0, keepdim=True)
 
     # Resample to 16k (what most speaker encoders expect)
-    target_sr = 16000
-    if sr != target_sr:
-        waveform = torchaudio.functional.resample(waveform, sr, target_sr)
-
-    # SpeechBrain expects [batch, time] or [batch, channels, time] depending on version.
-    # Most common: [batch, time]
-    if waveform.dim() == 2:  # [1, time]
-        batch_wav = waveform  # already mono
-    else:
-        batch_wav = waveform.squeeze(0)
+    if sr != SAMPLE_RATE:
+        waveform = torchaudio.functional.resample(waveform, sr, SAMPLE_RATE, lowpass_filter_width=6)
+    return waveform
+
+
+def amp_context(device):
+    """bf16 (fp16 on older GPUs) autocast for the encoder forward on CUDA; no-op on CPU."""
+    if device != "cuda":
+        return contextlib.nullcontext()
+    dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+    return torch.autocast(device_type="cuda", dtype=dtype)
+
+
+ENROLL_EXTS = {".wav", ".mp3", ".m4a", ".mp4", ".mov", ".aac", ".flac", ".ogg", ".webm"}
+ENROLL_CACHE_DIR = Path("pretrained_models") / "enroll_cache"
+ENROLL_CACHE_MAX_FILES = int(os.getenv("SPEAKER_ENROLL_CACHE_MAX", "2000"))  # oldest-used are evicted past this
 
-    with torch.no_grad():
-        emb = classifier.encode_batch(batch_wav)  # tensor
 
-    # emb is usually [batch, 1, emb_dim] or [batch, emb_dim]
-    emb = emb.squeeze().cpu().numpy()
+def enroll_cache_key(path: Path) -> str:
+    """Hash of the first 1 MiB plus size and mtime: changes whenever the recording does."""
+    st = path.stat()
+    with open(path, "rb") as f:
+        digest = hashlib.blake2b(f.read(1 << 20), digest_size=8).hexdigest()
+    return f"{digest}_{st.st_size}_{st.st_mtime_ns}"
+
+
+def enroll_cache_subdir(source: str, savedir: Path, emb_dim: int) -> str:
+    """Per-model cache subdirectory name, so embeddings from another checkpoint or size are never reused."""
+    tag = hashlib.blake2b(f"{source}|{savedir.resolve()}".encode("utf-8"), digest_size=6).hexdigest()
+    return f"{Path(source).name}_{emb_dim}d_{tag}"
+
+
+def load_cached_embedding(cache_path: Path):
+    try:
+        emb = np.load(cache_path)
+    except (OSError, ValueError):
+        return None
+    with contextlib.suppress(OSError):
+        os.utime(cache_path)  # mtime doubles as last-used time for eviction
     return emb
 
 
+def prune_enroll_cache(cache_root: Path, max_files: int = ENROLL_CACHE_MAX_FILES):
+    """Deletes the least recently used cached embeddings (any model) under cache_root beyond max_files."""
+    entries = []
+    for f in cache_root.rglob("*.npy"):
+        with contextlib.suppress(OSError):
+            entries.append((f.stat().st_mtime_ns, f))
+    if len(entries) <= max_files:
+        return
+    entries.sort(reverse=True)
+    for _, f in entries[max_files:]:
+        with contextlib.suppress(OSError):
+            f.unlink()
+
+
+EMBED_BATCH_SIZE = 32
+# Padded audio per forward pass. ECAPA's activations grow with batch x length,
+# so a batch of long clips (minutes-long enrollments) gets fewer of them
+EMBED_BATCH_SECONDS = float(os.getenv("SPEAKER_EMBED_BATCH_SECONDS", "120"))
+
+
+def _embed_batches(order, lengths):
+    """Splits length-sorted indices into batches whose padded size fits EMBED_BATCH_SECONDS."""
+    budget = EMBED_BATCH_SECONDS * SAMPLE_RATE
+    batch = []
+    for i in order:
+        # Sorted ascending, so the newest clip sets the padded length
+        if batch and (len(batch) >= EMBED_BATCH_SIZE or (len(batch) + 1) * lengths[i] > budget):
+            yield batch
+            batch = []
+        batch.append(i)
+    if batch:
+        yield batch
+
+
+def embed_batch(classifier, wavs, device):
+    """
+    Returns an [N, emb_dim] float32 tensor, left on `device`, for a list of
+    1D 16k waveforms. Clips are length-sorted and padded into mini-batches
+    capped at EMBED_BATCH_SIZE clips and EMBED_BATCH_SECONDS of padded audio;
+    wav_lens tells the encoder where each clip ends.
+    """
+    lengths = [w.shape[0] for w in wavs]
+    order = sorted(range(len(wavs)), key=lengths.__getitem__)
+    parts = []
+    for idx in _embed_batches(order, lengths):
+        chunk = [wavs[i] for i in idx]
+        lens = torch.tensor([w.shape[0] for w in chunk], dtype=torch.float32)
+        batch = torch.nn.utils.rnn.pad_sequence(chunk, batch_first=True)
+        with torch.inference_mode(), amp_context(device):
+            emb = classifier.encode_batch(batch.to(device), wav_lens=(lens / lens.max()).to(device))
+        parts.append(emb.reshape(len(chunk), -1).float())
+    embs = torch.cat(parts)
+    out = torch.empty_like(embs)
+    out[torch.tensor(order, device=embs.device)] = embs
+    return out
+
 
 def merge_consecutive(rows):
-    # rows: list of dicts with speaker_name + text
+    # rows: list of dicts with speaker_name + text. Each run of one speaker
+    # becomes its first row, with the texts joined and the last row's end.
     out = []
-    last = None
-    for r in rows:
-        if not r["text"].strip():
-            continue
-        if last and last["speaker_name"] == r["speaker_name"]:
-            last["text"] = (last["text"] + " " + r["text"]).strip()
-            last["end"] = r["end"]
-        else:
-            last = dict(r)
-            out.append(last)
+    for _, run in groupby((r for r in rows if r["text"].strip()), key=itemgetter("speaker_name")):
+        run = list(run)
+        merged = dict(run[0])
+        if len(run) > 1:
+            merged["text"] = " ".join(r["text"] for r in run).strip()
+            merged["end"] = run[-1]["end"]
+        out.append(merged)
     return out
 
 
-def main():
-    if len(sys.argv) < 4:
-        print("Usage: python identify_speakers.py output/utterances.json enroll_folder output/named_script.txt [--participants first1,last1,first2,last2,...]")
-        sys.exit(1)
-
-    utter_path = Path(sys.argv[1])
-    enroll_dir = Path(sys.argv[2])
-    out_txt = Path(sys.argv[3])
-    
-    # Parse optional --participants argument
-    participant_names = None
-    if "--participants" in sys.argv:
-        idx = sys.argv.index("--participants")
-        if idx + 1 < len(sys.argv):
-            participant_names = [name.strip() for name in sys.argv[idx + 1].split(",")]
-            print(f"Filtering enrollment files to participants: {participant_names}")
-
-    if not utter_path.exists():
-        raise FileNotFoundError(utter_path)
-    if not enroll_dir.exists():
-        raise FileNotFoundError(enroll_dir)
-
-    utterances = json.loads(utter_path.read_text(encoding="utf-8"))
+def format_speaker_name(speaker_name, is_unknown, username_to_name, speaker_profiles):
+    """Display name for a labeled speaker in named_script.txt."""
+    # Handle unknown speakers (keep as "Speaker N")
+    if is_unknown or (speaker_name.startswith("Speaker ") and len(speaker_name) > 8 and speaker_name[8:].split()[0].isdigit()):
+        # Keep unknown speaker labels as-is
+        formatted_name = speaker_name
+    elif speaker_name != "Unknown":
+        # Convert username to "First Last" format using mapping
+        # Remove any (2), (3) etc. patterns first
+        speaker_name_clean = _PAREN_NUM_RE.sub("", speaker_name).strip()
+        # Global speaker profile display name mapping (for non-user profiles)
+        prof = speaker_profiles.get(speaker_name_clean.lower()) if isinstance(speaker_profiles, dict) else None
+        if isinstance(prof, dict) and prof.get("display_name"):
+            formatted_name = str(prof.get("display_name"))
+        # Look up in username mapping
+        elif speaker_name_clean in username_to_name:
+            formatted_name = username_to_name[speaker_name_clean]
+        elif "," in speaker_name_clean:
+            # Fallback: old format "first,last"
+            parts = speaker_name_clean.split(",")
+            if len(parts) == 2:
+                first = parts[0].strip().capitalize()
+                last = parts[1].strip().capitalize()
+                formatted_name = f"{first} {last}"
+            else:
+                formatted_name = speaker_name_clean.capitalize()
+        else:
+            # Just capitalize if no mapping found
+            formatted_name = speaker_name_clean.capitalize()
+    else:
+        # Legacy "Unknown" -> convert to "Speaker 1" for consistency
+        formatted_name = "Speaker 1"
+    return formatted_name
 
-    # Find the base meeting wav used for slicing:
-    # If your pipeline writes output/<stem>_16k.wav, infer it:
-    stem = utter_path.stem.replace("_utterances", "")
-    meeting_wav = Path("output") / f"{stem}_16k.wav"
-    if not meeting_wav.exists():
-        raise FileNotFoundError(f"Expected meeting wav at {meeting_wav}. Run your transcriber first.")
 
+@functools.lru_cache(maxsize=1)
+def load_classifier():
+    """Loads the ECAPA speaker model once per process; returns (classifier, device). Exits if no model can be loaded."""
     # Compatibility shim:
     # Some SpeechBrain versions call `huggingface_hub.hf_hub_download(..., use_auth_token=...)`,
     # but newer huggingface_hub renamed that kwarg to `token`.
@@ -205,6 +298,8 @@ def main():
 
     # Load speaker embedding model (ECAPA)
     device = "cuda" if torch.cuda.is_available() else "cpu"
+    # Allow TF32 tensor cores for any fp32 matmuls left outside autocast
+    torch.set_float32_matmul_precision("high")
     savedir = Path("pretrained_models/spkrec-ecapa-voxceleb")
     savedir.mkdir(parents=True, exist_ok=True)
     
@@ -212,10 +307,11 @@ def main():
     local_cache = Path.home() / ".cache/huggingface/hub/models--speechbrain--spkrec-ecapa-voxceleb"
     
     classifier = None
+    source = "speechbrain/spkrec-ecapa-voxceleb"
     try:
         # Try loading from HuggingFace with local_files_only first (use cached model)
         classifier = EncoderClassifier.from_hparams(
-            source="speechbrain/spkrec-ecapa-voxceleb",
+            source=source,
             savedir=str(savedir),
             run_opts={"device": device},
             use_auth_token=hf_token if hf_token else None,
@@ -238,6 +334,7 @@ def main():
                             savedir=str(savedir),
                             run_opts={"device": device},
                         )
+                        source = local_source
                         print(f"Loaded speaker model from local cache: {local_source}")
             except Exception as e2:
                 print(f"Could not load from local cache: {e2}")
@@ -245,8 +342,9 @@ def main():
         if classifier is None:
             print("Trying alternative model loading...")
             try:
+                source = "speechbrain/spkrec-ecapa-voxceleb2"
                 classifier = EncoderClassifier.from_hparams(
-                    source="speechbrain/spkrec-ecapa-voxceleb2",
+                    source=source,
                     savedir=str(savedir),
                     run_opts={"device": device},
                 )
@@ -255,14 +353,51 @@ def main():
                 print("Speaker identification will be skipped.")
                 sys.exit(1)
 
+    # Cached enrollment embeddings are only valid for the model that made them;
+    # one short dummy forward pass gives the embedding size
+    emb_dim = embed_batch(classifier, [torch.zeros(SAMPLE_RATE)], device).shape[1]
+    classifier.enroll_cache_subdir = enroll_cache_subdir(source, savedir, emb_dim)
+    return classifier, device
+
+
+def identify(classifier, device, utter_path: Path, enroll_dir: Path, out_txt: Path, participant_names=None,
+             enroll_cache_root: Path = ENROLL_CACHE_DIR):
+    """Labels the diarized utterances in utter_path with enrolled speaker names and writes out_txt (+ .json)."""
+    if participant_names is not None:
+        print(f"Filtering enrollment files to participants: {participant_names}")
+
+    if not utter_path.exists():
+        raise FileNotFoundError(utter_path)
+    if not enroll_dir.exists():
+        raise FileNotFoundError(enroll_dir)
+
+    utterances = json.loads(utter_path.read_text(encoding="utf-8"))
+
+    # Find the base meeting wav used for slicing:
+    # If your pipeline writes output/<stem>_16k.wav, infer it:
+    stem = utter_path.stem.replace("_utterances", "")
+    meeting_wav = Path("output") / f"{stem}_16k.wav"
+    if not meeting_wav.exists():
+        raise FileNotFoundError(f"Expected meeting wav at {meeting_wav}. Run your transcriber first.")
+
     # Build enrollment embeddings
     # Use lists to store multiple embeddings per person (for averaging)
     enroll_embs_dict = {}  # name_normalized -> list of embeddings
-    tmp_enroll = Path("output") / "_enroll_wavs"
-    tmp_enroll.mkdir(parents=True, exist_ok=True)
+    enroll_files = []  # (name_normalized, path, duration) that passed the filters
 
     def get_audio_duration(file_path: Path) -> float:
-        """Get audio file duration in seconds using ffprobe"""
+        """Get audio file duration in seconds from the file header (ffprobe as a last resort)"""
+        try:
+            info = sf.info(str(file_path))
+            return info.frames / info.samplerate
+        except Exception:
+            pass
+        try:
+            info = torchaudio.info(str(file_path))
+            if info.num_frames and info.sample_rate:
+                return info.num_frames / info.sample_rate
+        except Exception:
+            pass
         try:
             result = subprocess.run(
                 [
@@ -283,81 +418,100 @@ def main():
             pass
         return 0.0
 
-    for p in sorted(enroll_dir.iterdir()):
-        if p.is_file() and p.suffix.lower() in [".wav", ".mp3", ".m4a", ".mp4", ".mov", ".aac", ".flac", ".ogg", ".webm"]:
-            # Only use files >= 2 seconds for voice recognition (lowered from 15s for demo)
-            duration = get_audio_duration(p)
-            if duration < 2.0:
-                print(f"Skipping enrollment file (too short: {duration:.1f}s < 2s): {p.name}")
-                continue
-            
-            # Extract name from filename: "firstname,lastname.ext" or "username.ext" or with (2), (3), etc.
-            # Name is everything before the first dot (extension) or parenthesis
-            name = p.stem.lower().strip()
-            name_normalized = re.sub(r"\(\d+\)", "", name)  # Remove (2), (3), etc. for matching
-            name_normalized = name_normalized.strip()  # Clean up
-            
-            # If participant_names is specified, only process files matching those participants
-            if participant_names is not None:
-                # Check if this file matches any participant
-                matches = False
-                for participant_name in participant_names:
-                    # Participant names are in "firstname,lastname" format (lowercase)
-                    participant_normalized = participant_name.lower().strip()
-                    
-                    # Match if:
-                    # 1. Exact match (e.g., "bobby,jones" == "bobby,jones")
-                    # 2. Username match (e.g., "bobbyjones" matches if participant is "bobby,jones")
-                    if name_normalized == participant_normalized:
+    candidates = [p for p in sorted(enroll_dir.iterdir()) if p.is_file() and p.suffix.lower() in ENROLL_EXTS]
+    # Header reads (and any ffprobe fallbacks) for all files run concurrently
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+        durations = dict(zip(candidates, ex.map(get_audio_duration, candidates)))
+
+    for p in candidates:
+        # Only use files >= 2 seconds for voice recognition (lowered from 15s for demo)
+        duration = durations[p]
+        if duration < 2.0:
+            print(f"Skipping enrollment file (too short: {duration:.1f}s < 2s): {p.name}")
+            continue
+        
+        # Extract name from filename: "firstname,lastname.ext" or "username.ext" or with (2), (3), etc.
+        # Name is everything before the first dot (extension) or parenthesis
+        name = p.stem.lower().strip()
+        name_normalized = _PAREN_NUM_RE.sub("", name)  # Remove (2), (3), etc. for matching
+        name_normalized = name_normalized.strip()  # Clean up
+        
+        # If participant_names is specified, only process files matching those participants
+        if participant_names is not None:
+            # Check if this file matches any participant
+            matches = False
+            for participant_name in participant_names:
+                # Participant names are in "firstname,lastname" format (lowercase)
+                participant_normalized = participant_name.lower().strip()
+                
+                # Match if:
+                # 1. Exact match (e.g., "bobby,jones" == "bobby,jones")
+                # 2. Username match (e.g., "bobbyjones" matches if participant is "bobby,jones")
+                if name_normalized == participant_normalized:
+                    matches = True
+                    break
+                # Also check if filename is username format (no comma) and matches firstname,lastname
+                elif "," not in name_normalized and "," in participant_normalized:
+                    # Remove comma from participant name to get username
+                    username_from_participant = participant_normalized.replace(",", "").replace(" ", "")
+                    if name_normalized == username_from_participant:
+                        matches = True
+                        break
+                # Or if filename has comma but participant is username (backward compatibility)
+                elif "," in name_normalized and "," not in participant_normalized:
+                    # Remove comma from filename to get username
+                    username_from_filename = name_normalized.replace(",", "").replace(" ", "")
+                    if username_from_filename == participant_normalized:
                         matches = True
                         break
-                    # Also check if filename is username format (no comma) and matches firstname,lastname
-                    elif "," not in name_normalized and "," in participant_normalized:
-                        # Remove comma from participant name to get username
-                        username_from_participant = participant_normalized.replace(",", "").replace(" ", "")
-                        if name_normalized == username_from_participant:
-                            matches = True
-                            break
-                    # Or if filename has comma but participant is username (backward compatibility)
-                    elif "," in name_normalized and "," not in participant_normalized:
-                        # Remove comma from filename to get username
-                        username_from_filename = name_normalized.replace(",", "").replace(" ", "")
-                        if username_from_filename == participant_normalized:
-                            matches = True
-                            break
-                
-                if not matches:
-                    print(f"Skipping enrollment file (not a participant): {p.name}")
-                    continue
-            
-            # Convert to wav and create embedding
-            wav = tmp_enroll / f"{name_normalized}_{p.stem}.wav"  # Include original stem to avoid conflicts
-            to_wav_16k_mono(p, wav)
-            emb = embed(classifier, wav)
             
-            # Store multiple embeddings per person (will average later)
-            if name_normalized not in enroll_embs_dict:
-                enroll_embs_dict[name_normalized] = []
-            enroll_embs_dict[name_normalized].append(emb)
-            print(f"Enrolled speaker: {name_normalized} (from {p.name}, {duration:.1f}s)")
+            if not matches:
+                print(f"Skipping enrollment file (not a participant): {p.name}")
+                continue
+        
+        enroll_files.append((name_normalized, p, duration))
+
+    # Reuse cached embeddings for unchanged files; decode the rest in parallel
+    # and embed them in one batched pass
+    enroll_cache_root = Path(enroll_cache_root).resolve()
+    cache_dir = enroll_cache_root / classifier.enroll_cache_subdir
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    cache_paths = [cache_dir / f"{enroll_cache_key(p)}.npy" for _, p, _ in enroll_files]
+    enroll_file_embs = [load_cached_embedding(c) for c in cache_paths]
+    todo = [i for i, e in enumerate(enroll_file_embs) if e is None]
+    if todo:
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+            enroll_wavs = list(ex.map(load_16k_mono, [enroll_files[i][1] for i in todo]))
+        new_embs = embed_batch(classifier, [w[0] for w in enroll_wavs], device).cpu().numpy()
+        for i, emb in zip(todo, new_embs):
+            enroll_file_embs[i] = emb
+            np.save(cache_paths[i], emb)
+        prune_enroll_cache(enroll_cache_root)
+    for (name_normalized, p, duration), emb in zip(enroll_files, enroll_file_embs):
+        # Store multiple embeddings per person (will average later)
+        if name_normalized not in enroll_embs_dict:
+            enroll_embs_dict[name_normalized] = []
+        enroll_embs_dict[name_normalized].append(emb)
+        print(f"Enrolled speaker: {name_normalized} (from {p.name}, {duration:.1f}s)")
 
     if not enroll_embs_dict:
         raise RuntimeError("No enrollment audio files found in enroll folder.")
     
     # Average embeddings for each person (better voice recognition with multiple samples)
+    # Stored unit-normalized, so matching never has to renormalize them
     enroll_embs = {}
     for name_normalized, emb_list in enroll_embs_dict.items():
         if len(emb_list) == 1:
-            enroll_embs[name_normalized] = emb_list[0]
+            avg_emb = emb_list[0]
         else:
             # Average all embeddings for this person
             avg_emb = np.mean(emb_list, axis=0)
-            enroll_embs[name_normalized] = avg_emb
             print(f"Averaged {len(emb_list)} enrollment files for {name_normalized}")
+        enroll_embs[name_normalized] = avg_emb / (np.linalg.norm(avg_emb) + 1e-9)
 
-    # For each diarized utterance, slice audio, embed, and match to enrolled speaker
-    tmp_segs = Path("output") / "_seg_wavs"
-    tmp_segs.mkdir(parents=True, exist_ok=True)
+    # Enrollment matrix: cosine scores become one matmul
+    names = list(enroll_embs)
+    enroll_mat = np.stack([enroll_embs[n] for n in names])
 
     # Configuration for speaker matching thresholds
     # These can be overridden via environment variables or command-line args
@@ -370,11 +524,12 @@ def main():
     # 3. Apply the voted speaker to all utterances from that diarization speaker
     
     # First pass: collect scores for all utterances
-    utterance_data = []  # List of (utterance_info, all_scores, diarization_speaker)
-    diarization_speaker_scores = {}  # diarization_speaker -> {enrolled_name -> [scores]}
+    utterance_data = []  # List of (utterance_info, best match, diarization_speaker)
     
     print(f"Processing {len(utterances)} utterances...")
     
+    # Gather the segments worth embedding, then embed them all in batches
+    segments = []  # (start, end, text, diarization_speaker)
     for i, u in enumerate(utterances):
         start = float(u["start"])
         end = float(u["end"])
@@ -386,28 +541,68 @@ def main():
         if end - start < 0.6:
             continue
 
-        seg_wav = tmp_segs / f"seg_{i:05d}.wav"
-        slice_wav(meeting_wav, start, end, seg_wav)
-        seg_emb = embed(classifier, seg_wav)
-
         # Get diarization speaker ID
-        diarization_speaker = u.get("speaker", f"SPEAKER_{i}")
+        segments.append((start, end, txt, u.get("speaker", f"SPEAKER_{i}")))
+
+    # Decode the meeting once; each segment is then a view into this buffer
+    # One bulk host-to-device copy; every clip is then a view sliced on the device
+    meeting_t = load_meeting_16k(meeting_wav).to(device, non_blocking=True)
+
+    def seg_wave(i):
+        s0 = int(segments[i][0] * SAMPLE_RATE)
+        return meeting_t[s0:max(s0 + 1, int(segments[i][1] * SAMPLE_RATE))]
+
+    # Near-silent clips have no voice to embed; they never vote, so a
+    # diarization speaker with nothing else stays unidentified
+    rms = [seg_wave(i).square().mean().sqrt() for i in range(len(segments))]
+    rms = torch.stack(rms).tolist() if rms else []
+    voiced = [i for i in range(len(segments)) if rms[i] >= SILENCE_RMS]
+    # Sub-second clips embed poorly and pollute the vote, so they only inherit
+    # their diarization speaker's identity, unless that speaker has nothing longer
+    long_speakers = {segments[i][3] for i in voiced if segments[i][1] - segments[i][0] >= MIN_EMBED_SECONDS}
+    embed_idx = [
+        i for i in voiced
+        if segments[i][1] - segments[i][0] >= MIN_EMBED_SECONDS or segments[i][3] not in long_speakers
+    ]
+    # Embedding stability saturates after about a dozen clips, so each
+    # diarization speaker votes with only its longest segments; the rest
+    # inherit the voted identity like the short ones
+    by_speaker = {}
+    for i in embed_idx:
+        by_speaker.setdefault(segments[i][3], []).append(i)
+    max_segments = int(os.getenv("SPEAKER_MAX_SEGMENTS", "12"))  # longest N per diarization speaker
+    embed_idx = sorted(
+        i for idxs in by_speaker.values()
+        for i in sorted(idxs, key=lambda i: segments[i][0] - segments[i][1])[:max_segments]
+    )
+    seg_wavs = [seg_wave(i) for i in embed_idx]
+    if seg_wavs:
+        # Normalize and score on the encoder's device; only the small
+        # [N_seg, N_enroll] score matrix comes back to the CPU
+        seg_embs = torch.nn.functional.normalize(embed_batch(classifier, seg_wavs, device), dim=1)
+        enroll_t = torch.from_numpy(enroll_mat).to(seg_embs.device, dtype=seg_embs.dtype)
+        score_matrix = (seg_embs @ enroll_t.T).cpu().numpy()  # [N_seg, N_enroll]
+    else:
+        score_matrix = np.zeros((0, len(names)), dtype=np.float32)
+    seg_rows = dict(zip(embed_idx, score_matrix))
+
+    for i, (start, end, txt, diarization_speaker) in enumerate(segments):
+        row = seg_rows.get(i)
+        if row is None:
+            utterance_data.append({
+                "start": start,
+                "end": end,
+                "text": txt,
+                "diarization_speaker": diarization_speaker,
+                "best_name": None,
+                "best_score": None,
+            })
+            continue
 
-        # Match against enrolled speakers
-        scores = {}
-        for name, e in enroll_embs.items():
-            scores[name] = cosine(seg_emb, e)
-        
-        # Store scores for voting
-        if diarization_speaker not in diarization_speaker_scores:
-            diarization_speaker_scores[diarization_speaker] = {n: [] for n in enroll_embs.keys()}
-        for name, score in scores.items():
-            diarization_speaker_scores[diarization_speaker][name].append(score)
-        
-        # Sort by score
-        sorted_scores = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
-        best_name = sorted_scores[0][0] if sorted_scores else None
-        best_score = sorted_scores[0][1] if sorted_scores else -1
+        # Best enrolled match for this segment
+        best = int(row.argmax())
+        best_name = names[best]
+        best_score = float(row[best])
         
         utterance_data.append({
             "start": start,
@@ -416,36 +611,44 @@ def main():
             "diarization_speaker": diarization_speaker,
             "best_name": best_name,
             "best_score": best_score,
-            "all_scores": scores
         })
     
     # Second pass: vote on best speaker per diarization speaker
-    # Use the average of top scores for each enrolled speaker
+    # Use the average score of each enrolled speaker over the diarization
+    # speaker's embedded segments, accumulated as one [N_diar, N_enroll] matrix.
+    # Plain mean by default; SPEAKER_WEIGHTED_VOTE=1 weights longer utterances
+    # more (their embeddings are more reliable) for comparison
+    weighted_vote = os.getenv("SPEAKER_WEIGHTED_VOTE", "0") == "1"
+    diar_speakers = list(dict.fromkeys(segments[i][3] for i in embed_idx))
+    diar_idx = {spk: d for d, spk in enumerate(diar_speakers)}
+    seg_diar = np.array([diar_idx[segments[i][3]] for i in embed_idx], dtype=np.intp)
+    if weighted_vote:
+        seg_w = np.array([segments[i][1] - segments[i][0] for i in embed_idx])
+    else:
+        seg_w = np.ones(len(embed_idx))
+    # Weighted one-hot [N_diar, N_seg] membership: the per-speaker sums are one GEMM
+    membership = np.zeros((len(diar_speakers), len(embed_idx)))
+    membership[seg_diar, np.arange(len(embed_idx))] = seg_w
+    avg_matrix = (membership @ score_matrix) / membership.sum(axis=1, keepdims=True)
+
+    # Check if confident enough (using lower threshold for aggregated scores - 0.65)
+    AGGREGATED_THRESHOLD = float(os.getenv("SPEAKER_AGGREGATE_THRESHOLD", "0.65"))
+    LOWER_THRESHOLD = float(os.getenv("SPEAKER_LOWER_THRESHOLD", "0.50"))
+    LARGE_MARGIN = float(os.getenv("SPEAKER_LARGE_MARGIN", "0.20"))
+
     diarization_to_identified = {}  # diarization_speaker -> (identified_name, avg_score)
     
-    for diar_spk, name_scores in diarization_speaker_scores.items():
-        # Calculate average score for each enrolled speaker
-        avg_scores = {}
-        for name, scores_list in name_scores.items():
-            if scores_list:
-                # Use weighted average - weight longer utterances more
-                avg_scores[name] = sum(scores_list) / len(scores_list)
-        
-        if not avg_scores:
-            continue
-        
-        # Find best match by average score
-        sorted_avg = sorted(avg_scores.items(), key=lambda kv: kv[1], reverse=True)
-        best_name, best_avg = sorted_avg[0]
-        second_avg = sorted_avg[1][1] if len(sorted_avg) > 1 else 0
-        
-        # Check if confident enough (using lower threshold for aggregated scores - 0.65)
-        AGGREGATED_THRESHOLD = float(os.getenv("SPEAKER_AGGREGATE_THRESHOLD", "0.65"))
-        LOWER_THRESHOLD = float(os.getenv("SPEAKER_LOWER_THRESHOLD", "0.50"))
-        LARGE_MARGIN = float(os.getenv("SPEAKER_LARGE_MARGIN", "0.20"))
+    for diar_spk, avg_row in zip(diar_speakers, avg_matrix):
+        # Find best match by average score: only the top few are ever read,
+        # so partition them out and sort just those
+        k = min(4, len(avg_row))
+        order = np.argpartition(-avg_row, k - 1)[:k]
+        order = order[np.argsort(-avg_row[order])]
+        best_name, best_avg = names[order[0]], float(avg_row[order[0]])
+        second_avg = float(avg_row[order[1]]) if len(order) > 1 else 0
         
         # Debug: print all avg scores for this diarization speaker
-        print(f"  {diar_spk} scores: " + ", ".join(f"{n}={s:.3f}" for n, s in sorted_avg[:4]))
+        print(f"  {diar_spk} scores: " + ", ".join(f"{names[j]}={avg_row[j]:.3f}" for j in order[:4]))
         
         margin = best_avg - second_avg
         
@@ -456,7 +659,7 @@ def main():
         high_margin_match = best_avg >= LOWER_THRESHOLD and margin >= LARGE_MARGIN
         
         if standard_match or high_margin_match:
-            normalized_name = re.sub(r"\(\d+\)", "", best_name).strip()
+            normalized_name = _PAREN_NUM_RE.sub("", best_name).strip()
             diarization_to_identified[diar_spk] = (normalized_name, best_avg)
             match_type = "standard" if standard_match else "high-margin"
             print(f"    ✓ {diar_spk} -> {normalized_name} (avg: {best_avg:.3f}, margin: {margin:.3f}, {match_type})")
@@ -534,44 +737,18 @@ def main():
     
     # Write script with proper name formatting
     out_txt.parent.mkdir(parents=True, exist_ok=True)
-    lines = []
-    for r in labeled:
-        speaker_name = r['speaker_name']
-        is_unknown = r.get('is_unknown', False)
-        
-        # Handle unknown speakers (keep as "Speaker N")
-        if is_unknown or (speaker_name.startswith("Speaker ") and len(speaker_name) > 8 and speaker_name[8:].split()[0].isdigit()):
-            # Keep unknown speaker labels as-is
-            formatted_name = speaker_name
-        elif speaker_name != "Unknown":
-            # Convert username to "First Last" format using mapping
-            # Remove any (2), (3) etc. patterns first
-            speaker_name_clean = re.sub(r"\(\d+\)", "", speaker_name).strip()
-            # Global speaker profile display name mapping (for non-user profiles)
-            prof = speaker_profiles.get(speaker_name_clean.lower()) if isinstance(speaker_profiles, dict) else None
-            if isinstance(prof, dict) and prof.get("display_name"):
-                formatted_name = str(prof.get("display_name"))
-            # Look up in username mapping
-            elif speaker_name_clean in username_to_name:
-                formatted_name = username_to_name[speaker_name_clean]
-            elif "," in speaker_name_clean:
-                # Fallback: old format "first,last"
-                parts = speaker_name_clean.split(",")
-                if len(parts) == 2:
-                    first = parts[0].strip().capitalize()
-                    last = parts[1].strip().capitalize()
-                    formatted_name = f"{first} {last}"
-                else:
-                    formatted_name = speaker_name_clean.capitalize()
-            else:
-                # Just capitalize if no mapping found
-                formatted_name = speaker_name_clean.capitalize()
-        else:
-            # Legacy "Unknown" -> convert to "Speaker 1" for consistency
-            formatted_name = "Speaker 1"
-        
-        lines.append(f"{formatted_name}: {r['text']}")
-    out_txt.write_text("\n\n".join(lines) + "\n", encoding="utf-8")
+    # Format each distinct speaker once; the write loop is then a plain lookup
+    formatted_cache = {
+        key: format_speaker_name(*key, username_to_name, speaker_profiles)
+        for key in dict.fromkeys((r['speaker_name'], r.get('is_unknown', False)) for r in labeled)
+    }
+
+    with out_txt.open("w", encoding="utf-8") as f_txt:
+        for n, r in enumerate(labeled):
+            if n:
+                f_txt.write("\n\n")
+            f_txt.write(f"{formatted_cache[(r['speaker_name'], r.get('is_unknown', False))]}: {r['text']}")
+        f_txt.write("\n")
     
     # Print summary of unknown speakers
     unknown_speakers_found = [r['speaker_name'] for r in labeled if r.get('is_unknown', False) or (r['speaker_name'].startswith("Speaker ") and len(r['speaker_name']) > 8 and r['speaker_name'][8:].split()[0].isdigit())]
@@ -581,10 +758,169 @@ def main():
 
     # Also write a JSON if you want to inspect confidence
     out_json = out_txt.with_suffix(".json")
-    out_json.write_text(json.dumps(labeled, indent=2, ensure_ascii=False), encoding="utf-8")
+    with out_json.open("w", encoding="utf-8") as f_json:
+        json.dump(labeled, f_json, indent=2, ensure_ascii=False)  # streams chunks, no full-size str
 
     print(f"Wrote:\n  {out_txt}\n  {out_json}")
 
 
+
+_UID = os.getuid() if hasattr(os, "getuid") else getpass.getuser()
+SERVER_SOCKET = os.getenv("SPEAKER_ID_SOCKET", os.path.join(tempfile.gettempdir(), f"bobby_spkid_{_UID}.sock"))
+SERVER_CONNECT_TIMEOUT = 5.0
+SERVER_REPLY_TIMEOUT = float(os.getenv("SPEAKER_ID_SERVER_TIMEOUT", "900"))  # seconds for one identify() run
+# identify() reads these on every call; the client forwards its own values so
+# web_app's per-user thresholds reach a long-running server
+REQUEST_ENV_VARS = (
+    "SPEAKER_MATCH_THRESHOLD", "SPEAKER_MATCH_MARGIN", "SPEAKER_AGGREGATE_THRESHOLD",
+    "SPEAKER_LOWER_THRESHOLD", "SPEAKER_LARGE_MARGIN", "SPEAKER_WEIGHTED_VOTE", "SPEAKER_MAX_SEGMENTS",
+)
+
+
+@contextlib.contextmanager
+def request_env(env: dict):
+    """Sets REQUEST_ENV_VARS to the client's values (unset if it had none) and restores them afterwards."""
+    saved = {k: os.environ.get(k) for k in REQUEST_ENV_VARS}
+    try:
+        for k in REQUEST_ENV_VARS:
+            if k in env:
+                os.environ[k] = str(env[k])
+            else:
+                os.environ.pop(k, None)
+        yield
+    finally:
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+
+class _IdentifyHandler(socketserver.StreamRequestHandler):
+    """One JSON request per connection; replies with the run's log and success flag."""
+
+    def handle(self):
+        log = io.StringIO()
+        server_cwd = os.getcwd()
+        try:
+            req = json.loads(self.rfile.readline())
+            os.chdir(req["cwd"])  # input/users.csv etc. are relative to the caller
+            # One request at a time (no ThreadingMixIn), so swapping os.environ is safe
+            with request_env(req.get("env") or {}), contextlib.redirect_stdout(log):
+                identify(
+                    self.server.classifier, self.server.device,
+                    Path(req["utter_path"]), Path(req["enroll_dir"]), Path(req["out_txt"]),
+                    req.get("participants"), Path(req["enroll_cache_root"]),
+                )
+            resp = {"ok": True}
+        except (Exception, SystemExit) as e:
+            resp = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        finally:
+            os.chdir(server_cwd)
+        resp["log"] = log.getvalue()
+        with contextlib.suppress(OSError):  # the client may have given up waiting
+            self.wfile.write(json.dumps(resp, ensure_ascii=False).encode("utf-8") + b"\n")
+
+
+def serve():
+    """Keeps the speaker model loaded and runs identify() for CLI invocations sent over SERVER_SOCKET."""
+    if not hasattr(socketserver, "UnixStreamServer"):
+        print("--server needs Unix domain sockets, which this platform does not support.")
+        sys.exit(1)
+    classifier, device = load_classifier()
+    try:
+        st = os.lstat(SERVER_SOCKET)
+    except FileNotFoundError:
+        pass
+    else:
+        if not stat.S_ISSOCK(st.st_mode):
+            print(f"{SERVER_SOCKET} exists and is not a socket; set SPEAKER_ID_SOCKET to another path.")
+            sys.exit(1)
+        os.unlink(SERVER_SOCKET)  # left behind by a server that did not shut down cleanly
+    old_umask = os.umask(0o177)  # socket is created 0600: only this user can submit jobs
+    try:
+        server = socketserver.UnixStreamServer(SERVER_SOCKET, _IdentifyHandler)
+    finally:
+        os.umask(old_umask)
+    with server:
+        server.classifier, server.device = classifier, device
+        print(f"Speaker ID server listening on {SERVER_SOCKET}")
+        try:
+            server.serve_forever()
+        finally:
+            os.unlink(SERVER_SOCKET)
+
+
+def dispatch_to_server(utter_path: Path, enroll_dir: Path, out_txt: Path, participant_names) -> bool:
+    """Runs the job on a --server worker if one is listening. Returns False to fall back to in-process."""
+    if not hasattr(socket, "AF_UNIX"):
+        return False
+    try:
+        st = os.stat(SERVER_SOCKET)
+    except OSError:
+        return False
+    # Never hand job paths to a socket another user put at this path
+    if not stat.S_ISSOCK(st.st_mode) or (hasattr(os, "getuid") and st.st_uid != os.getuid()):
+        return False
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(SERVER_CONNECT_TIMEOUT)
+    try:
+        sock.connect(SERVER_SOCKET)
+    except OSError:
+        sock.close()
+        return False
+    req = {
+        "cwd": os.getcwd(),
+        "utter_path": str(utter_path.resolve()),
+        "enroll_dir": str(enroll_dir.resolve()),
+        "out_txt": str(out_txt.resolve()),
+        "participants": participant_names,
+        "enroll_cache_root": str(ENROLL_CACHE_DIR.resolve()),
+        "env": {k: os.environ[k] for k in REQUEST_ENV_VARS if k in os.environ},
+    }
+    sock.settimeout(SERVER_REPLY_TIMEOUT)
+    try:
+        with sock, sock.makefile("rwb") as f:
+            f.write(json.dumps(req).encode("utf-8") + b"\n")
+            f.flush()
+            resp = json.loads(f.readline() or b"{}")
+    except socket.timeout:
+        # The server may still be running this job and will write out_txt itself,
+        # so running it here as well would race it for the same outputs
+        print(f"Speaker ID server did not answer within {SERVER_REPLY_TIMEOUT:g}s.", file=sys.stderr)
+        sys.exit(1)
+    print(resp.get("log", ""), end="")
+    if not resp.get("ok"):
+        print(resp.get("error") or "Speaker ID server closed the connection.", file=sys.stderr)
+        sys.exit(1)
+    return True
+
+
+def main():
+    if "--server" in sys.argv:
+        serve()
+        return
+
+    if len(sys.argv) < 4:
+        print("Usage: python identify_speakers.py output/utterances.json enroll_folder output/named_script.txt [--participants first1,last1,first2,last2,...]")
+        print("       python identify_speakers.py --server   (keep the model loaded; later runs are sent to it)")
+        sys.exit(1)
+
+    utter_path = Path(sys.argv[1])
+    enroll_dir = Path(sys.argv[2])
+    out_txt = Path(sys.argv[3])
+    
+    # Parse optional --participants argument
+    participant_names = None
+    if "--participants" in sys.argv:
+        idx = sys.argv.index("--participants")
+        if idx + 1 < len(sys.argv):
+            participant_names = [name.strip() for name in sys.argv[idx + 1].split(",")]
+
+    if dispatch_to_server(utter_path, enroll_dir, out_txt, participant_names):
+        return
+    classifier, device = load_classifier()
+    identify(classifier, device, utter_path, enroll_dir, out_txt, participant_names)
+
 if __name__ == "__main__":
     main()
@@ -2,8 +2,10 @@
 Ollama client for Phi AI chat interface.
 Supports streaming and non-streaming responses.
 """
+import json
 import os
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Iterator, Optional, Dict, Any
 from pathlib import Path
 
@@ -21,6 +23,12 @@ OLLAMA_BASE_URL = (
 )
 OLLAMA_MODEL = os.environ.get("OLLAMA_MODEL", "qwen2.5:3b")
 
+# One keep-alive session for every Ollama call, so back-to-back health checks
+# and chat turns reuse the same localhost connection
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+_SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
 _OLLAMA_STATUS_CACHE = {
     "ts": 0.0,
     "ready": False,
@@ -34,7 +42,7 @@ def check_ollama_health(timeout: float = 5.0):
     Returns (is_healthy, error_message) tuple
     """
     try:
-        response = requests.get(f"{OLLAMA_BASE_URL}/api/tags", timeout=timeout)
+        response = _SESSION.get(f"{OLLAMA_BASE_URL}/api/tags", timeout=timeout)
         if response.status_code == 200:
             return True, None
         else:
@@ -53,7 +61,7 @@ def check_model_available(timeout: float = 5.0):
     Returns (is_available, error_message) tuple
     """
     try:
-        response = requests.get(f"{OLLAMA_BASE_URL}/api/tags", timeout=timeout)
+        response = _SESSION.get(f"{OLLAMA_BASE_URL}/api/tags", timeout=timeout)
         if response.status_code != 200:
             return False, "Cannot connect to Ollama."
         
@@ -87,6 +95,25 @@ def get_ollama_status_cached(ttl_seconds: float = 5.0, timeout: float = 1.0):
     _OLLAMA_STATUS_CACHE["error"] = err
     return ready, err
 
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _iter_stream_tokens(response) -> Iterator[str]:
+    """Yield the "response" text of each NDJSON line from a streaming /api/generate call."""
+    # Ollama's NDJSON carries no charset, so tell requests to decode UTF-8 itself
+    response.encoding = "utf-8"
+    for line in response.iter_lines(chunk_size=8192, decode_unicode=True):
+        if line and line.strip():
+            try:
+                chunk = _JSON_DECODER.decode(line)
+            except json.JSONDecodeError:
+                continue
+            if "response" in chunk:
+                yield chunk["response"]
+            if chunk.get("done", False):
+                break
+
+
 def generate_response(
     prompt: str,
     system_prompt: Optional[str] = None,
@@ -123,7 +150,7 @@ def generate_response(
         payload["system"] = system_prompt
     
     try:
-        response = requests.post(
+        response = _SESSION.post(
             f"{OLLAMA_BASE_URL}/api/generate",
             json=payload,
             stream=stream,
@@ -136,19 +163,7 @@ def generate_response(
             return
         
         if stream:
-            for line in response.iter_lines():
-                if line:
-                    try:
-                        data = line.decode('utf-8')
-                        if data.strip():
-                            import json
-                            chunk = json.loads(data)
-                            if "response" in chunk:
-                                yield chunk["response"]
-                            if chunk.get("done", False):
-                                break
-                    except (json.JSONDecodeError, UnicodeDecodeError):
-                        continue
+            yield from _iter_stream_tokens(response)
         else:
             result = response.json()
             yield result.get("response", "")
@@ -217,7 +232,7 @@ def generate_conversational_response(
         payload["system"] = system_prompt
     
     try:
-        response = requests.post(
+        response = _SESSION.post(
             f"{OLLAMA_BASE_URL}/api/generate",
             json=payload,
             stream=stream,
@@ -230,19 +245,7 @@ def generate_conversational_response(
             return
         
         if stream:
-            for line in response.iter_lines():
-                if line:
-                    try:
-                        data = line.decode('utf-8')
-                        if data.strip():
-                            import json
-                            chunk = json.loads(data)
-                            if "response" in chunk:
-                                yield chunk["response"]
-                            if chunk.get("done", False):
-                                break
-                    except (json.JSONDecodeError, UnicodeDecodeError):
-                        continue
+            yield from _iter_stream_tokens(response)
         else:
             result = response.json()
             yield result.get("response", "")
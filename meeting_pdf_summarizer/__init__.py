@@ -1,20 +1,38 @@
 """PDF summarization package."""
 from pathlib import Path
 from typing import Optional
+import importlib
 import sys
 
-# Check dependencies on import
-try:
-    from .summarize_pdf import summarize_pdf
-    from .summary_types import SummaryConfig, SummaryResult
-except ImportError as e:
-    # Provide helpful error message
-    print(f"[WARN] Could not import PDF summarization modules: {e}")
-    print(f"       Install dependencies: pip install reportlab requests python-dotenv pypdf")
-    # Don't fail completely, allow graceful degradation
-    summarize_pdf = None
-    SummaryConfig = None
-    SummaryResult = None
+from .summary_types import SummaryConfig, SummaryResult
+
+
+def _load_summarize_pdf():
+    """
+    Import summarize_pdf on first use: it pulls in requests, reportlab and pypdf,
+    which make `import meeting_pdf_summarizer` (and `--help`) slow otherwise.
+    Returns None if those dependencies are missing.
+
+    Always resolves the function on the submodule: after
+    `import meeting_pdf_summarizer.summarize_pdf` the package attribute of the
+    same name is the submodule, not the function.
+    """
+    try:
+        summarize_pdf = importlib.import_module(".summarize_pdf", __name__).summarize_pdf
+    except ImportError as e:
+        # Provide helpful error message
+        print(f"[WARN] Could not import PDF summarization modules: {e}")
+        print(f"       Install dependencies: pip install reportlab requests python-dotenv pypdf")
+        # Don't fail completely, allow graceful degradation
+        summarize_pdf = None
+    globals()["summarize_pdf"] = summarize_pdf
+    return summarize_pdf
+
+
+def __getattr__(name):
+    if name == "summarize_pdf":
+        return _load_summarize_pdf()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def prepare_pdf_for_sending(original_pdf_path: Path, output_dir: Optional[Path] = None) -> Optional[Path]:
@@ -31,6 +49,7 @@ def prepare_pdf_for_sending(original_pdf_path: Path, output_dir: Optional[Path]
     Returns:
         Path to the summary PDF, or None if summarization failed
     """
+    summarize_pdf = _load_summarize_pdf()
     if summarize_pdf is None:
         print(f"[ERROR] PDF summarization not available - dependencies missing")
         print(f"       Install: pip install reportlab requests python-dotenv pypdf")
@@ -1,6 +1,65 @@
 """Check if all dependencies for PDF summarization are available."""
+import importlib.util
+import os
 import sys
-from typing import List, Tuple
+import time
+from typing import Dict, List, Optional, Tuple
+
+# A probe is an HTTP round trip (up to a 5 s timeout), so repeated
+# check_dependencies() calls reuse a recent result per OLLAMA_URL. Failures
+# expire quickly so a server that was just started is picked up
+OLLAMA_PROBE_TTL = 30.0
+OLLAMA_PROBE_FAILURE_TTL = 2.0
+_ollama_probe_cache: Dict[str, Tuple[float, Optional[str]]] = {}
+_session = None
+
+
+def _installed(module: str) -> bool:
+    """True if `module` is importable; locates it without running its code."""
+    return importlib.util.find_spec(module) is not None
+
+
+def _get_session():
+    """Shared keep-alive session for Ollama probes, created on first use."""
+    global _session
+    if _session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        _session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+        _session.mount("http://", adapter)
+        _session.mount("https://", adapter)
+    return _session
+
+
+def _probe_ollama(base_url: str) -> Optional[str]:
+    """Returns a warning about the Ollama server at base_url, or None if it is usable."""
+    import requests
+    try:
+        response = _get_session().get(f"{base_url}/api/tags", timeout=5)
+        if response.status_code == 200:
+            models = response.json().get("models", [])
+            if not models:
+                return "Ollama is running but no models are installed (run: ollama pull qwen2.5:3b)"
+        else:
+            return f"Ollama API returned status {response.status_code}"
+    except requests.exceptions.ConnectionError:
+        return "Ollama is not running or not accessible (required for summarization)"
+    except Exception as e:
+        return f"Could not verify Ollama: {e}"
+    return None
+
+
+def _cached_ollama_probe(base_url: str) -> Optional[str]:
+    now = time.monotonic()
+    cached = _ollama_probe_cache.get(base_url)
+    if cached is not None:
+        checked_at, warning = cached
+        if now - checked_at < (OLLAMA_PROBE_TTL if warning is None else OLLAMA_PROBE_FAILURE_TTL):
+            return warning
+    warning = _probe_ollama(base_url)
+    _ollama_probe_cache[base_url] = (now, warning)
+    return warning
 
 
 def check_dependencies() -> Tuple[bool, List[str]]:
@@ -13,62 +72,44 @@ def check_dependencies() -> Tuple[bool, List[str]]:
     missing = []
     warnings = []
     
-    # Required dependencies
-    try:
-        import reportlab
-    except ImportError:
+    # Required dependencies (find_spec checks presence without importing)
+    if not _installed("reportlab"):
         missing.append("reportlab (required for PDF generation)")
     
-    try:
-        import requests
-    except ImportError:
+    has_requests = _installed("requests")
+    if not has_requests:
         missing.append("requests (required for Ollama API)")
     
-    try:
-        from dotenv import load_dotenv
-    except ImportError:
+    has_dotenv = _installed("dotenv")
+    if not has_dotenv:
         missing.append("python-dotenv (required for config)")
     
     # Optional but recommended for PDF extraction
-    try:
-        from pypdf import PdfReader
-    except ImportError:
+    if not _installed("pypdf"):
         warnings.append("pypdf (optional but recommended for PDF text extraction)")
     
     # Optional OCR dependencies
-    try:
-        import pytesseract
-    except ImportError:
+    if not _installed("pytesseract"):
         warnings.append("pytesseract (optional, needed for scanned PDFs)")
     
-    try:
-        from pdf2image import convert_from_path
-    except ImportError:
+    if not _installed("pdf2image"):
         warnings.append("pdf2image (optional, needed for scanned PDFs)")
     
-    try:
-        from PIL import Image
-    except ImportError:
+    if not _installed("PIL"):
         warnings.append("Pillow (optional, needed for OCR)")
     
-    # Check Ollama availability
-    try:
-        import os
-        from dotenv import load_dotenv
-        load_dotenv()
-        base_url = os.getenv("OLLAMA_URL", "http://localhost:11434")
-        import requests
-        response = requests.get(f"{base_url}/api/tags", timeout=5)
-        if response.status_code == 200:
-            models = response.json().get("models", [])
-            if not models:
-                warnings.append("Ollama is running but no models are installed (run: ollama pull qwen2.5:3b)")
-        else:
-            warnings.append(f"Ollama API returned status {response.status_code}")
-    except requests.exceptions.ConnectionError:
-        warnings.append("Ollama is not running or not accessible (required for summarization)")
-    except Exception as e:
-        warnings.append(f"Could not verify Ollama: {e}")
+    # Check Ollama availability; the probe is the only place that really
+    # imports requests/dotenv, so skip it when they are already reported missing
+    if has_requests and has_dotenv:
+        try:
+            from dotenv import load_dotenv
+            load_dotenv()
+            base_url = os.getenv("OLLAMA_URL", "http://localhost:11434")
+            warning = _cached_ollama_probe(base_url)
+            if warning:
+                warnings.append(warning)
+        except Exception as e:
+            warnings.append(f"Could not verify Ollama: {e}")
     
     all_required = len(missing) == 0
     return all_required, missing + warnings
@@ -1,12 +1,9 @@
 """Command-line interface for PDF summarization."""
 import argparse
+import sys
 from pathlib import Path
-from typing import Optional
 
-from .summarize_pdf import summarize_pdf
 from .summary_types import SummaryConfig
-from .render_pdf import render_summary_pdf
-import json
 
 
 def main():
@@ -58,6 +55,16 @@ def main():
     args = parser.parse_args()
     
     if args.command == "summarize":
+        # Deferred: requests/reportlab/pypdf are only needed to actually summarize.
+        # Import the function from its submodule: the package attribute of the
+        # same name is the submodule once anything has imported it
+        try:
+            from .summarize_pdf import summarize_pdf
+        except ImportError as e:
+            print(f"[WARN] Could not import PDF summarization modules: {e}")
+            print(f"       Install dependencies: pip install reportlab requests python-dotenv pypdf")
+            sys.exit(1)
+        
         config = SummaryConfig(
             mode=args.mode,
             use_ocr=args.ocr,
@@ -77,7 +84,7 @@ def main():
                 print(f"   Risks: {result.summary_stats.get('risks_count', 0)}")
         else:
             print(f"❌ Error: {result.error}")
-            exit(1)
+            sys.exit(1)
 
 
 if __name__ == "__main__":
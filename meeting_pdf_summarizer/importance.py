@@ -1,33 +1,46 @@
 """Importance scoring and filtering for PDF content."""
 import re
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Set, Iterable
+
+import numpy as np
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
 
 
 # Keywords that indicate important content
-ACTION_KEYWORDS = [
+ACTION_KEYWORDS = frozenset([
     'action', 'task', 'todo', 'assign', 'owner', 'due', 'deadline', 'deliverable',
     'next step', 'follow up', 'complete', 'finish', 'implement'
-]
+])
 
-DECISION_KEYWORDS = [
+DECISION_KEYWORDS = frozenset([
     'decide', 'decision', 'approve', 'approval', 'agree', 'agreement', 'consensus',
     'vote', 'chosen', 'selected', 'final', 'approved'
-]
+])
 
-OUTCOME_KEYWORDS = [
+OUTCOME_KEYWORDS = frozenset([
     'outcome', 'result', 'conclusion', 'summary', 'key finding', 'takeaway',
     'achievement', 'milestone', 'delivered', 'completed'
-]
+])
 
-RISK_KEYWORDS = [
+RISK_KEYWORDS = frozenset([
     'risk', 'blocker', 'issue', 'problem', 'concern', 'challenge', 'obstacle',
     'dependency', 'constraint', 'limitation', 'warning'
-]
+])
 
-METRIC_KEYWORDS = [
+METRIC_KEYWORDS = frozenset([
     'metric', 'kpi', 'number', 'percent', '%', 'increase', 'decrease', 'growth',
     'target', 'goal', 'budget', 'cost', 'revenue', 'users', 'customers'
-]
+])
+
+BOILERPLATE_PHRASES = frozenset([
+    'thank you', 'please find', 'see attached', 'best regards', 'sincerely',
+    'page', 'table of contents', 'confidential', 'proprietary'
+])
 
 DATE_PATTERNS = [
     r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}',  # MM/DD/YYYY
@@ -40,6 +53,71 @@ EMAIL_PATTERN = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
 PHONE_PATTERN = r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b|\b\(\d{3}\)\s?\d{3}[-.]?\d{4}\b'
 
 
+def _keyword_re(keywords: Iterable[str]) -> re.Pattern:
+    """One alternation that finds any keyword as a substring, like `kw in text`."""
+    return re.compile('|'.join(re.escape(k) for k in sorted(keywords)))
+
+
+# Compiled once at import; the scoring and extraction loops run per sentence
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+_DIGIT_RE = re.compile(r'\d+')
+_PCT_RE = re.compile(r'%|percent|increase|decrease')
+_EMAIL_RE = re.compile(EMAIL_PATTERN)
+_PHONE_RE = re.compile(PHONE_PATTERN)
+_ACTION_RE = _keyword_re(ACTION_KEYWORDS)
+_DECISION_RE = _keyword_re(DECISION_KEYWORDS)
+_OUTCOME_RE = _keyword_re(OUTCOME_KEYWORDS)
+_RISK_RE = _keyword_re(RISK_KEYWORDS)
+_METRIC_RE = _keyword_re(METRIC_KEYWORDS)
+_BOILERPLATE_RE = _keyword_re(BOILERPLATE_PHRASES)
+# All date formats in one alternation, so a sentence is scanned once. Every
+# format starts with a digit or a month name; the lookahead lets the engine
+# skip other positions without trying each branch
+_DATE_ALTERNATION = r'(?=[\dJFMASOND])(?:' + '|'.join(f'(?:{p})' for p in DATE_PATTERNS) + ')'
+_DATE_RE = re.compile(_DATE_ALTERNATION)
+_DATE_RE_I = re.compile(_DATE_ALTERNATION, re.IGNORECASE)
+_OWNER_ACTION_RE = re.compile(r'(?:assigned to|owner|responsible|by)\s*:?\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)', re.IGNORECASE)
+_OWNER_DECISION_RE = re.compile(r'(?:approved by|decided by|by)\s*:?\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)', re.IGNORECASE)
+
+_KEYWORD_CATEGORIES = {
+    'action': ACTION_KEYWORDS,
+    'decision': DECISION_KEYWORDS,
+    'outcome': OUTCOME_KEYWORDS,
+    'risk': RISK_KEYWORDS,
+    'metric': METRIC_KEYWORDS,
+    'boilerplate': BOILERPLATE_PHRASES,
+}
+_CATEGORY_RES = {
+    'action': _ACTION_RE,
+    'decision': _DECISION_RE,
+    'outcome': _OUTCOME_RE,
+    'risk': _RISK_RE,
+    'metric': _METRIC_RE,
+    'boilerplate': _BOILERPLATE_RE,
+}
+
+
+def _build_keyword_automaton():
+    """One Aho-Corasick automaton over every category's keywords, so a single
+    pass over a sentence reports all categories that fire."""
+    automaton = ahocorasick.Automaton()
+    for category, keywords in _KEYWORD_CATEGORIES.items():
+        for kw in keywords:
+            automaton.add_word(kw, automaton.get(kw, frozenset()) | {category})
+    automaton.make_automaton()
+    return automaton
+
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton() if AHOCORASICK_AVAILABLE else None
+
+
+def _keyword_categories(sentence_lower: str) -> Set[str]:
+    """Names of the keyword categories with at least one keyword in the sentence."""
+    if _KEYWORD_AUTOMATON is not None:
+        return {c for _, cats in _KEYWORD_AUTOMATON.iter(sentence_lower) for c in cats}
+    return {c for c, pattern in _CATEGORY_RES.items() if pattern.search(sentence_lower)}
+
+
 def score_sentence_importance(sentence: str) -> float:
     """
     Score a sentence's importance (0.0 to 1.0).
@@ -47,45 +125,34 @@ def score_sentence_importance(sentence: str) -> float:
     """
     score = 0.0
     sentence_lower = sentence.lower()
+    categories = _keyword_categories(sentence_lower)
     
     # Check for action items
-    for keyword in ACTION_KEYWORDS:
-        if keyword in sentence_lower:
-            score += 0.15
-            break
+    if 'action' in categories:
+        score += 0.15
     
     # Check for decisions
-    for keyword in DECISION_KEYWORDS:
-        if keyword in sentence_lower:
-            score += 0.15
-            break
+    if 'decision' in categories:
+        score += 0.15
     
     # Check for outcomes
-    for keyword in OUTCOME_KEYWORDS:
-        if keyword in sentence_lower:
-            score += 0.12
-            break
+    if 'outcome' in categories:
+        score += 0.12
     
     # Check for risks
-    for keyword in RISK_KEYWORDS:
-        if keyword in sentence_lower:
-            score += 0.12
-            break
+    if 'risk' in categories:
+        score += 0.12
     
     # Check for metrics/numbers
-    has_number = bool(re.search(r'\d+', sentence))
-    for keyword in METRIC_KEYWORDS:
-        if keyword in sentence_lower:
-            score += 0.1
-            break
-    if has_number and any(kw in sentence_lower for kw in ['%', 'percent', 'increase', 'decrease']):
+    has_number = bool(_DIGIT_RE.search(sentence))
+    if 'metric' in categories:
+        score += 0.1
+    if has_number and _PCT_RE.search(sentence_lower):
         score += 0.08
     
     # Check for dates
-    for pattern in DATE_PATTERNS:
-        if re.search(pattern, sentence, re.IGNORECASE):
-            score += 0.1
-            break
+    if _DATE_RE_I.search(sentence):
+        score += 0.1
     
     # Penalize very short or very long sentences
     word_count = len(sentence.split())
@@ -95,62 +162,118 @@ def score_sentence_importance(sentence: str) -> float:
         score *= 0.8
     
     # Penalize boilerplate
-    boilerplate_phrases = [
-        'thank you', 'please find', 'see attached', 'best regards', 'sincerely',
-        'page', 'table of contents', 'confidential', 'proprietary'
-    ]
-    for phrase in boilerplate_phrases:
-        if phrase in sentence_lower:
-            score *= 0.3
-            break
+    if 'boilerplate' in categories:
+        score *= 0.3
     
     return min(score, 1.0)
 
 
-def identify_important_sections(text: str, top_k: int = 50) -> List[Tuple[str, float]]:
+# Feature columns scored together by _score_sentences, and their weights
+_FEATURE_COLUMNS = ['action', 'decision', 'outcome', 'risk', 'metric', 'pct', 'date']
+_FEATURE_WEIGHTS = np.array([0.15, 0.15, 0.12, 0.12, 0.1, 0.08, 0.1])
+_SENTENCE_SEP = '\x00'  # not matched by \s, \d or any keyword, so no match spans two sentences
+
+
+def _offsets_to_mask(offsets, starts: np.ndarray) -> np.ndarray:
+    """Boolean mask of the sentences (by start offset) containing any of `offsets`."""
+    mask = np.zeros(len(starts), dtype=bool)
+    mask[np.searchsorted(starts, np.asarray(offsets, dtype=np.int64), side='right') - 1] = True
+    return mask
+
+
+def _sentence_hits(pattern: re.Pattern, joined: str, starts: np.ndarray) -> np.ndarray:
+    """Boolean mask of the sentences in `joined` that contain a match of `pattern`."""
+    return _offsets_to_mask([m.start() for m in pattern.finditer(joined)], starts)
+
+
+def _sentence_starts(sentences: List[str]) -> np.ndarray:
+    """Start offset of each sentence once joined with _SENTENCE_SEP."""
+    lengths = np.fromiter((len(s) + 1 for s in sentences), dtype=np.int64, count=len(sentences))
+    return np.concatenate(([0], np.cumsum(lengths[:-1])))
+
+
+def _score_sentences(sentences: List[str], lowered: List[str]) -> np.ndarray:
     """
-    Identify the most important sentences from text.
-    
-    Returns:
-        List of (sentence, score) tuples, sorted by score descending
+    Vectorized score_sentence_importance over a list of non-empty sentences
+    and their lowercased forms. Each pattern scans the joined document once;
+    match offsets are mapped back to sentences to build an
+    (n_sentences x n_features) matrix.
     """
-    # Split into sentences
-    sentences = re.split(r'(?<=[.!?])\s+', text)
-    
-    # Score each sentence
-    scored = [(s.strip(), score_sentence_importance(s.strip())) for s in sentences if s.strip()]
+    n = len(sentences)
+    joined = _SENTENCE_SEP.join(sentences)
+    starts = _sentence_starts(sentences)
+    # Separate offsets for the lowercased text: .lower() can change lengths
+    joined_lower = _SENTENCE_SEP.join(lowered)
+    starts_lower = _sentence_starts(lowered)
+
+    features = np.zeros((n, len(_FEATURE_COLUMNS)), dtype=bool)
+    col = {name: i for i, name in enumerate(_FEATURE_COLUMNS)}
+    if _KEYWORD_AUTOMATON is not None:
+        ends = {c: [] for c in _KEYWORD_CATEGORIES}
+        for end, cats in _KEYWORD_AUTOMATON.iter(joined_lower):
+            for c in cats:
+                ends[c].append(end)
+        category_hits = {c: _offsets_to_mask(e, starts_lower) for c, e in ends.items()}
+    else:
+        category_hits = {c: _sentence_hits(p, joined_lower, starts_lower) for c, p in _CATEGORY_RES.items()}
+    for c in ('action', 'decision', 'outcome', 'risk', 'metric'):
+        features[:, col[c]] = category_hits[c]
+    features[:, col['pct']] = _sentence_hits(_DIGIT_RE, joined, starts) & _sentence_hits(_PCT_RE, joined_lower, starts_lower)
+    features[:, col['date']] = _sentence_hits(_DATE_RE_I, joined, starts)
+
+    # Column by column rather than features @ weights, so the sums are
+    # bit-identical to score_sentence_importance and ties rank the same
+    scores = np.zeros(n)
+    for j, weight in enumerate(_FEATURE_WEIGHTS):
+        scores += features[:, j] * weight
+    word_counts = np.fromiter((len(s.split()) for s in sentences), dtype=np.int64, count=n)
+    scores[word_counts < 3] *= 0.5
+    scores[word_counts > 50] *= 0.8
+    scores[category_hits['boilerplate']] *= 0.3
+    return np.minimum(scores, 1.0)
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into stripped, non-empty sentences."""
+    return [s for s in (s.strip() for s in _SENTENCE_SPLIT_RE.split(text)) if s]
+
+
+def _important_sections(sentences: List[str], lowered: List[str], top_k: int) -> List[Tuple[str, float]]:
+    if not sentences:
+        return []
     
-    # Sort by score and return top K
-    scored.sort(key=lambda x: x[1], reverse=True)
-    return scored[:top_k]
+    # Score all sentences at once, then return the top K (stable on ties)
+    scores = _score_sentences(sentences, lowered)
+    candidates = np.arange(len(scores))
+    if 0 < top_k < len(scores):
+        # O(n) selection of the K-th best score; only sentences at or above
+        # it are sorted, in document order so ties keep their original rank
+        kth = -np.partition(-scores, top_k - 1)[top_k - 1]
+        candidates = np.flatnonzero(scores >= kth)
+    order = candidates[np.argsort(-scores[candidates], kind='stable')][:top_k]
+    return [(sentences[i], float(scores[i])) for i in order]
 
 
-def extract_action_items(text: str) -> List[Dict]:
-    """Extract action items from text (best-effort)."""
+def _action_items(sentences: List[str], lowered: List[str]) -> List[Dict]:
     action_items = []
-    sentences = re.split(r'(?<=[.!?])\s+', text)
-    
-    for sentence in sentences:
-        sentence_lower = sentence.lower()
-        if any(kw in sentence_lower for kw in ACTION_KEYWORDS):
+    for sentence, sentence_lower in zip(sentences, lowered):
+        if _ACTION_RE.search(sentence_lower):
             # Try to extract owner and due date
             owner = "Unassigned"
             due = "Not specified"
             
             # Look for "assigned to", "owner:", etc.
-            owner_match = re.search(r'(?:assigned to|owner|responsible|by)\s*:?\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)', sentence, re.IGNORECASE)
+            owner_match = _OWNER_ACTION_RE.search(sentence)
             if owner_match:
                 owner = owner_match.group(1)
             
             # Look for dates
-            for pattern in DATE_PATTERNS:
-                date_match = re.search(pattern, sentence)
-                if date_match:
-                    due = date_match.group(0)
-                    break
+            date_match = _DATE_RE.search(sentence)
+            if date_match:
+                due = date_match.group(0)
             
             action_items.append({
-                'action': sentence.strip(),
+                'action': sentence,
                 'owner': owner,
                 'due': due
             })
@@ -158,31 +281,25 @@ def extract_action_items(text: str) -> List[Dict]:
     return action_items
 
 
-def extract_decisions(text: str) -> List[Dict]:
-    """Extract decisions from text (best-effort)."""
+def _decisions(sentences: List[str], lowered: List[str]) -> List[Dict]:
     decisions = []
-    sentences = re.split(r'(?<=[.!?])\s+', text)
-    
-    for sentence in sentences:
-        sentence_lower = sentence.lower()
-        if any(kw in sentence_lower for kw in DECISION_KEYWORDS):
+    for sentence, sentence_lower in zip(sentences, lowered):
+        if _DECISION_RE.search(sentence_lower):
             owner = "Unassigned"
             date = "Not specified"
             
             # Look for decision maker
-            owner_match = re.search(r'(?:approved by|decided by|by)\s*:?\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)', sentence, re.IGNORECASE)
+            owner_match = _OWNER_DECISION_RE.search(sentence)
             if owner_match:
                 owner = owner_match.group(1)
             
             # Look for dates
-            for pattern in DATE_PATTERNS:
-                date_match = re.search(pattern, sentence)
-                if date_match:
-                    date = date_match.group(0)
-                    break
+            date_match = _DATE_RE.search(sentence)
+            if date_match:
+                date = date_match.group(0)
             
             decisions.append({
-                'decision': sentence.strip(),
+                'decision': sentence,
                 'owner': owner,
                 'effective_date': date
             })
@@ -190,11 +307,52 @@ def extract_decisions(text: str) -> List[Dict]:
     return decisions
 
 
+def identify_important_sections(text: str, top_k: int = 50) -> List[Tuple[str, float]]:
+    """
+    Identify the most important sentences from text.
+    
+    Returns:
+        List of (sentence, score) tuples, sorted by score descending
+    """
+    sentences = split_sentences(text)
+    return _important_sections(sentences, [s.lower() for s in sentences], top_k)
+
+
+def extract_action_items(text: str) -> List[Dict]:
+    """Extract action items from text (best-effort)."""
+    sentences = split_sentences(text)
+    return _action_items(sentences, [s.lower() for s in sentences])
+
+
+def extract_decisions(text: str) -> List[Dict]:
+    """Extract decisions from text (best-effort)."""
+    sentences = split_sentences(text)
+    return _decisions(sentences, [s.lower() for s in sentences])
+
+
 def find_pii(text: str) -> Dict[str, List[str]]:
     """Find PII (emails, phone numbers) in text."""
-    emails = re.findall(EMAIL_PATTERN, text)
-    phones = re.findall(PHONE_PATTERN, text)
+    # Dedupe while scanning instead of building a list of every match first
+    return {
+        'emails': list({m.group(0) for m in _EMAIL_RE.finditer(text)}),
+        'phones': list({m.group(0) for m in _PHONE_RE.finditer(text)})
+    }
+
+
+def analyze_text(text: str, top_k: int = 50) -> Dict:
+    """
+    Run all importance extractors over text, splitting and lowercasing the
+    sentences once.
+    
+    Returns:
+        Dict with 'important_sections', 'action_items', 'decisions' and 'pii',
+        as returned by the individual functions above
+    """
+    sentences = split_sentences(text)
+    lowered = [s.lower() for s in sentences]
     return {
-        'emails': list(set(emails)),
-        'phones': list(set(phones))
+        'important_sections': _important_sections(sentences, lowered, top_k),
+        'action_items': _action_items(sentences, lowered),
+        'decisions': _decisions(sentences, lowered),
+        'pii': find_pii(text),
     }
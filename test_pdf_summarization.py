@@ -34,6 +34,48 @@ def test_dependencies():
         print(f"⚠️  Could not check dependencies: {e}")
         return False
 
+def test_batch_scoring_non_ascii():
+    """Test that batch sentence scoring matches the per-sentence scorer on non-ASCII text."""
+    print("\nTesting batch importance scoring on non-ASCII text...")
+    from meeting_pdf_summarizer.importance import _score_sentences, score_sentence_importance
+    sentences = [
+        "We decided to ship on Jan\xa05, 2024.",  # no-break space
+        "Deadline moved to 5\u2009March 2024 for the launch.",  # thin space
+        "Review is due ١٢/٣/٢٠٢٤ per the owner.",  # Arabic-Indic digits
+        "Café budget grew 12% — Straße team owns it by 2024-03-05.",
+        "İstanbul office: no blockers reported.",  # .lower() changes the length
+        "Plain sentence with nothing notable.",
+    ]
+    batch = _score_sentences(sentences, [s.lower() for s in sentences])
+    expected = [score_sentence_importance(s) for s in sentences]
+    assert list(batch) == expected, f"{list(batch)} != {expected}"
+    print("✅ Batch scores match per-sentence scores")
+    return True
+
+def test_cli_after_submodule_import():
+    """Test that the CLI calls the summarizer after its submodule was imported directly."""
+    print("\nTesting CLI after importing the summarize_pdf submodule...")
+    try:
+        import meeting_pdf_summarizer.summarize_pdf  # binds the package attribute to the submodule
+    except ImportError as e:
+        print(f"⚠️  Skipped, summarizer dependencies missing: {e}")
+        return True
+    from meeting_pdf_summarizer import cli
+    missing_pdf = ROOT / "output" / "__missing__.pdf"
+    argv = sys.argv
+    sys.argv = ["meeting_pdf_summarizer", "summarize", "--in", str(missing_pdf), "--out", str(missing_pdf)]
+    try:
+        cli.main()
+        code = 0
+    except SystemExit as e:
+        code = e.code
+    finally:
+        sys.argv = argv
+    # The summarizer ran and reported the missing input (instead of a TypeError)
+    assert code == 1, f"CLI exited with {code!r}"
+    print("✅ CLI reached the summarizer")
+    return True
+
 def test_pdf_summarization(pdf_path: Path):
     """Test PDF summarization with a real PDF."""
     print(f"\nTesting PDF summarization with: {pdf_path}")
@@ -74,8 +116,22 @@ def main():
     # Test 2: Dependencies
     if not test_dependencies():
         print("\n⚠️  Some dependencies missing, but continuing...")
+
+    # Test 3: Batch importance scoring
+    try:
+        test_batch_scoring_non_ascii()
+    except AssertionError as e:
+        print(f"❌ Batch scoring mismatch: {e}")
+        return 1
+    
+    # Test 4: CLI after a direct submodule import
+    try:
+        test_cli_after_submodule_import()
+    except (AssertionError, TypeError) as e:
+        print(f"❌ CLI test failed: {e}")
+        return 1
     
-    # Test 3: Find a test PDF
+    # Test 5: Find a test PDF
     output_dir = ROOT / "output"
     test_pdfs = list(output_dir.glob("*_meeting_report.pdf"))
     
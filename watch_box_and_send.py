@@ -1,3 +1,4 @@
+import os
 import time
 import sys
 import subprocess
@@ -29,20 +30,20 @@ def file_is_stable(path: Path, stable_seconds=8, checks=4) -> bool:
     """
     last_size = -1
     for _ in range(checks):
-        if not path.exists():
+        try:
+            size = os.stat(path).st_size
+        except OSError:
             return False
-        size = path.stat().st_size
         if size != last_size:
             last_size = size
-            time.sleep(stable_seconds)
-        else:
-            # size didn't change this interval; keep checking
-            time.sleep(stable_seconds)
+        # wait one interval before checking again
+        time.sleep(stable_seconds)
 
     # confirm one final time
-    if not path.exists():
+    try:
+        return os.stat(path).st_size == last_size
+    except OSError:
         return False
-    return path.stat().st_size == last_size
 
 def run_pipeline(audio_path: Path):
     stem = audio_path.stem
@@ -1496,7 +1496,7 @@ def _write_named_script_assets(named_txt_path: Path, named_json_path: Path, rows
 
 def _regenerate_transcript_pdf_from_named_json(meeting_id: str, named_json_path: Path) -> Optional[Path]:
     try:
-        from email_named_script import create_pdf as _create_pdf, read_db as _read_db
+        from email_named_script import create_pdf as _create_pdf, read_db as _read_db, load_named_json as _load_named_json
         people = {}
         try:
             # emails.csv may not exist in all deployments; PDF generation still works without it
@@ -1504,7 +1504,7 @@ def _regenerate_transcript_pdf_from_named_json(meeting_id: str, named_json_path:
         except Exception:
             people = {}
         out_pdf = OUTPUT_DIR / f"{meeting_id}_transcript.pdf"
-        ok = _create_pdf(named_json_path, people, out_pdf)
+        ok = _create_pdf(_load_named_json(named_json_path), people, out_pdf)
         if ok and out_pdf.exists() and out_pdf.stat().st_size > 0:
             return out_pdf
     except Exception as e:
@@ -4952,13 +4952,13 @@ def run_pipeline(audio_path: Path, cfg: dict, participants: list = None):
     if named_json_for_pdf.exists():
         try:
             _job_log(f"[{datetime.now().isoformat()}] Generating transcript PDF...")
-            from email_named_script import create_pdf as _create_transcript_pdf, read_db as _read_db_for_pdf
+            from email_named_script import create_pdf as _create_transcript_pdf, read_db as _read_db_for_pdf, load_named_json as _load_named_json_for_pdf
             people_for_pdf = {}
             try:
                 people_for_pdf = _read_db_for_pdf(Path("input") / "emails.csv")
             except Exception:
                 pass
-            ok = _create_transcript_pdf(named_json_for_pdf, people_for_pdf, transcript_pdf_path)
+            ok = _create_transcript_pdf(_load_named_json_for_pdf(named_json_for_pdf), people_for_pdf, transcript_pdf_path)
             if ok and transcript_pdf_path.exists() and transcript_pdf_path.stat().st_size > 0:
                 transcript_pdf_exists = True
                 print(f"✅ Created transcript PDF: {transcript_pdf_path} ({transcript_pdf_path.stat().st_size} bytes)")
@@ -4998,13 +4998,13 @@ def run_pipeline(audio_path: Path, cfg: dict, participants: list = None):
                 print(f"✅ Created {named_json_for_pdf.name} from utterances (fallback)")
                 
                 # Now generate PDF
-                from email_named_script import create_pdf as _create_transcript_pdf, read_db as _read_db_for_pdf
+                from email_named_script import create_pdf as _create_transcript_pdf, read_db as _read_db_for_pdf, load_named_json as _load_named_json_for_pdf
                 people_for_pdf = {}
                 try:
                     people_for_pdf = _read_db_for_pdf(Path("input") / "emails.csv")
                 except Exception:
                     pass
-                ok = _create_transcript_pdf(named_json_for_pdf, people_for_pdf, transcript_pdf_path)
+                ok = _create_transcript_pdf(_load_named_json_for_pdf(named_json_for_pdf), people_for_pdf, transcript_pdf_path)
                 if ok and transcript_pdf_path.exists() and transcript_pdf_path.stat().st_size > 0:
                     transcript_pdf_exists = True
                     print(f"✅ Created transcript PDF: {transcript_pdf_path} ({transcript_pdf_path.stat().st_size} bytes)")